@@ -46,6 +46,7 @@ def initialize_services():
         
         print("Loading prediction models...")
         predictor = MatchPredictor(models_dir=str(MODELS_DIR))
+        predictor.preload()
         
         print("Initializing Kalshi analyzer...")
         try:
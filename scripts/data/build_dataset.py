@@ -1,16 +1,16 @@
 
 # Build model-ready dataset
-from src.core.data.ingest import load_matches, load_players
-from src.core.features.engineer import build_match_dataset
+from src.core.data.ingest import load_matches, load_players, save_model_ready
+from src.core.features.engineer import build_match_dataset, downcast_model_ready
 
 RAW = "data/raw"
 OUT = "data/processed/matches_model_ready.csv"
 
 def main():
     matches = load_matches(RAW)
-    model_df = build_match_dataset(matches)
-    model_df.to_csv(OUT, index=False)
-    print(f"✅ Wrote {OUT} with shape {model_df.shape}")
+    model_df = downcast_model_ready(build_match_dataset(matches))
+    for path in save_model_ready(model_df, OUT):
+        print(f"✅ Wrote {path} with shape {model_df.shape}")
 
 if __name__ == "__main__":
     main()
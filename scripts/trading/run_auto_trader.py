@@ -12,7 +12,8 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.trading.auto_trader import create_auto_trader
+from src.trading.auto_trader import create_auto_trader, setup_logging
+from src.trading._value_kernel import warm_up as warm_up_value_kernel
 
 
 def main():
@@ -32,6 +33,9 @@ Examples:
   
   # Faster scanning (every 30 seconds)
   python scripts/trading/run_auto_trader.py --scan-interval 30
+  
+  # Back off to at most 10 minutes between scans while nothing is tradable
+  python scripts/trading/run_auto_trader.py --adaptive-polling --max-scan-interval 600
         """
     )
     
@@ -63,6 +67,19 @@ Examples:
         help="Seconds between market scans (default: 60)"
     )
     
+    parser.add_argument(
+        "--adaptive-polling",
+        action="store_true",
+        help="Back off the scan interval while scans find no opportunities"
+    )
+    
+    parser.add_argument(
+        "--max-scan-interval",
+        type=int,
+        default=None,
+        help="Longest interval for --adaptive-polling in seconds (default: 10x --scan-interval)"
+    )
+    
     parser.add_argument(
         "--max-hours",
         type=int,
@@ -117,7 +134,7 @@ Configuration:
   Minimum value threshold: {args.min_value:.1%}
   Minimum expected value: {args.min_ev:.1%}
   Max position size: {args.max_size} contracts
-  Scan interval: {args.scan_interval} seconds
+  Scan interval: {args.scan_interval} seconds{' (adaptive)' if args.adaptive_polling else ''}
   Max hours ahead: {args.max_hours} hours
   Min market volume: ${args.min_volume:,}
   Mode: {'DRY RUN (simulation)' if dry_run else 'LIVE TRADING'}
@@ -126,6 +143,8 @@ Configuration:
 Starting trader...
     """)
     
+    setup_logging()
+    
     try:
         # Create trader
         trader = create_auto_trader(
@@ -140,6 +159,9 @@ Starting trader...
         trader.max_hours_ahead = args.max_hours
         trader.min_volume = args.min_volume
         
+        # Pay the JIT compile cost once, before the first scan
+        warm_up_value_kernel()
+        
         if args.once:
             # Run single scan
             print("Running single scan...")
@@ -159,7 +181,10 @@ Starting trader...
             print(f"\nTotal trades in session: {summary['total_trades']}")
         else:
             # Run continuously
-            trader.run_continuous()
+            trader.run_continuous(
+                adaptive=args.adaptive_polling,
+                max_scan_interval=args.max_scan_interval,
+            )
             
     except KeyboardInterrupt:
         print("\n\nStopped by user")
@@ -17,8 +17,29 @@ sys.path.insert(0, str(project_root))
 from config.settings import RAW_DATA_DIR, MODELS_DIR
 from src.trading.kalshi_client import KalshiClient
 from src.trading.kalshi_analyzer import KalshiMarketAnalyzer
-from src.api.player_stats import PlayerStatsDB
-from src.api.predictor import MatchPredictor
+from src.api.player_stats import get_player_db
+from src.api.predictor import get_predictor
+
+
+# Display templates (filled with str.format_map - one format call per entry)
+OPPORTUNITY_TEMPLATE = (
+    "\n   [{i}/{total}] {title}\n"
+    "      Match: {players_str}\n"
+    "      Edge: {value:+.1%} | EV: {expected_value:+.1%} | Volume: {volume_str}\n"
+    "      Model Probability: {model_probability:.1%} | Kalshi Probability: {kalshi_probability:.1%}"
+    "{odds_line}\n"
+    "      🎯 BET ON: {bet_on_player} @ {yes_price:.1f}¢\n"
+    "      Ticker: {ticker}"
+)
+ODDS_LINE_TEMPLATE = "\n      Kalshi Odds: YES @ {yes_price:.1f}¢ | NO @ {no_price:.1f}¢"
+ANALYZED_MARKET_TEMPLATE = (
+    "  Model Probability: {model_probability:.1%}\n"
+    "  Kalshi Probability: {kalshi_probability:.1%}\n"
+    "  Value: {value:.1%}\n"
+    "  Expected Value: {expected_value:.1%}\n"
+    "  Tradable: {tradable_str}\n"
+    "  Reason: {reason}"
+)
 
 
 def main():
@@ -38,9 +59,18 @@ def main():
                        help="Maximum hours ahead to include markets (default: 48)")
     parser.add_argument("--min-volume", type=int, default=0,
                        help="Minimum market volume/pot in dollars (default: 0, no filter)")
+    parser.add_argument("--warm-cache", action="store_true",
+                       help="Build the player database cache and load models, then exit")
     
     args = parser.parse_args()
     
+    if args.warm_cache:
+        print("Warming player database cache...")
+        get_player_db(str(RAW_DATA_DIR))
+        get_predictor(str(MODELS_DIR)).preload()
+        print("✅ Cache ready")
+        return 0
+    
     print("=" * 70)
     print("Kalshi Tennis Market Scanner")
     print("=" * 70)
@@ -52,10 +82,10 @@ def main():
         kalshi_client = KalshiClient()
         print("✅ Kalshi client initialized")
         
-        player_db = PlayerStatsDB(raw_data_dir=str(RAW_DATA_DIR))
+        player_db = get_player_db(str(RAW_DATA_DIR))
         print("✅ Player database loaded")
         
-        predictor = MatchPredictor(models_dir=str(MODELS_DIR))
+        predictor = get_predictor(str(MODELS_DIR))
         print("✅ Prediction models loaded")
         
         analyzer = KalshiMarketAnalyzer(
@@ -94,6 +124,8 @@ def main():
             print(f"💰 TRADABLE OPPORTUNITIES ({len(tradable)})")
             print(f"{'=' * 70}")
             
+            # Build the whole listing and write it once (one flush instead of ~8 per opportunity)
+            lines = []
             for i, opp in enumerate(tradable, 1):
                 volume_str = f"${opp.get('market_volume', 0):,.0f}" if opp.get('market_volume') else "Unknown"
                 players = opp['matched_players']
@@ -108,17 +140,21 @@ def main():
                     else:
                         bet_on_player = players[1]
                 
-                print(f"\n   [{i}/{len(tradable)}] {opp['title']}")
-                print(f"      Match: {players_str}")
-                print(f"      Edge: {opp['value']:+.1%} | EV: {opp['expected_value']:+.1%} | Volume: {volume_str}")
-                print(f"      Model Probability: {opp['model_probability']:.1%} | Kalshi Probability: {opp['kalshi_probability']:.1%}")
                 kalshi_odds = opp.get('kalshi_odds', {})
                 yes_price = kalshi_odds.get('yes_price', 0)
                 no_price = kalshi_odds.get('no_price', 0)
-                if yes_price and no_price:
-                    print(f"      Kalshi Odds: YES @ {yes_price:.1f}¢ | NO @ {no_price:.1f}¢")
-                print(f"      🎯 BET ON: {bet_on_player} @ {yes_price:.1f}¢")
-                print(f"      Ticker: {opp['ticker']}")
+                odds_line = ODDS_LINE_TEMPLATE.format(yes_price=yes_price, no_price=no_price) if yes_price and no_price else ""
+                lines.append(OPPORTUNITY_TEMPLATE.format_map({
+                    **opp,
+                    "i": i,
+                    "total": len(tradable),
+                    "players_str": players_str,
+                    "volume_str": volume_str,
+                    "odds_line": odds_line,
+                    "bet_on_player": bet_on_player,
+                    "yes_price": yes_price,
+                }))
+            sys.stdout.write("\n".join(lines) + "\n")
         else:
             print(f"\n{'=' * 70}")
             print("⚠️  NO TRADABLE OPPORTUNITIES FOUND")
@@ -132,27 +168,28 @@ def main():
             print("=" * 70)
             print()
             
+            lines = []
             for i, analysis in enumerate(all_analyses, 1):
-                print(f"Market #{i}: {analysis.get('title', 'N/A')}")
-                print(f"  Ticker: {analysis.get('ticker', 'N/A')}")
+                lines.append(f"Market #{i}: {analysis.get('title', 'N/A')}")
+                lines.append(f"  Ticker: {analysis.get('ticker', 'N/A')}")
                 
                 if 'matched_players' in analysis and analysis['matched_players'][0]:
-                    print(f"  Players: {analysis['matched_players'][0]} vs {analysis['matched_players'][1]}")
+                    lines.append(f"  Players: {analysis['matched_players'][0]} vs {analysis['matched_players'][1]}")
                 
                 if 'error' in analysis:
-                    print(f"  Status: ERROR - {analysis.get('error', 'Unknown error')}")
-                    print(f"  Reason: {analysis.get('reason', 'N/A')}")
+                    lines.append(f"  Status: ERROR - {analysis.get('error', 'Unknown error')}")
+                    lines.append(f"  Reason: {analysis.get('reason', 'N/A')}")
                 elif 'model_probability' in analysis:
-                    print(f"  Model Probability: {analysis['model_probability']:.1%}")
-                    print(f"  Kalshi Probability: {analysis['kalshi_probability']:.1%}")
-                    print(f"  Value: {analysis['value']:.1%}")
-                    print(f"  Expected Value: {analysis['expected_value']:.1%}")
-                    print(f"  Tradable: {'YES' if analysis.get('tradable') else 'NO'}")
-                    print(f"  Reason: {analysis.get('reason', 'N/A')}")
+                    lines.append(ANALYZED_MARKET_TEMPLATE.format_map({
+                        **analysis,
+                        "tradable_str": 'YES' if analysis.get('tradable') else 'NO',
+                        "reason": analysis.get('reason', 'N/A'),
+                    }))
                 else:
-                    print(f"  Status: {analysis.get('error', 'Not analyzed')}")
-                    print(f"  Reason: {analysis.get('reason', 'N/A')}")
-                print()
+                    lines.append(f"  Status: {analysis.get('error', 'Not analyzed')}")
+                    lines.append(f"  Reason: {analysis.get('reason', 'N/A')}")
+                lines.append("")
+            sys.stdout.write("\n".join(lines) + "\n")
         
         return 0
         
@@ -0,0 +1,2 @@
+from src.core.models.train_all import main
+if __name__=='__main__': main()
@@ -3,23 +3,86 @@ Player statistics lookup utility for web predictions.
 Builds player database from match history and provides stats lookup.
 """
 
+import glob
 import pandas as pd
 import numpy as np
 from collections import defaultdict
+from functools import lru_cache
+from joblib import dump, load
 from src.core.data.ingest import load_matches
 from src.core.features.elo import Elo, SurfaceElo
+from src.core.features.engineer import normalize_surfaces
 from pathlib import Path
 
+# Bump when the cached layout (attributes saved by _save_cache) changes
+CACHE_VERSION = 2
+
 
 class PlayerStatsDB:
     """Database of player statistics computed from match history."""
     
-    def __init__(self, raw_data_dir="data/raw"):
+    def __init__(self, raw_data_dir="data/raw", use_cache=True):
         self.raw_data_dir = raw_data_dir
         self.name_to_id = {}
         self.id_to_name = {}
         self.player_stats = {}
+        self.h2h_matches = {}
+        
+        # Reuse the stats computed on a previous run while the raw CSVs are unchanged
+        if use_cache and self._load_cache():
+            return
         self._build_database()
+        if use_cache:
+            self._save_cache()
+    
+    @property
+    def cache_path(self):
+        """On-disk cache of the computed database (under the raw data dir)."""
+        return Path(self.raw_data_dir) / "_cache" / "player_db.joblib"
+    
+    def _source_fingerprint(self):
+        """(file, size, mtime) for every raw match file - the cache key."""
+        files = sorted(glob.glob(str(Path(self.raw_data_dir) / "atp_matches_*.csv")))
+        fingerprint = []
+        for f in files:
+            st = Path(f).stat()
+            fingerprint.append((Path(f).name, st.st_size, st.st_mtime_ns))
+        return fingerprint
+    
+    def _load_cache(self):
+        """Load the database from cache. Returns True if the cache was valid."""
+        path = self.cache_path
+        if not path.exists():
+            return False
+        try:
+            cached = load(path)
+            if cached.get("version") != CACHE_VERSION or cached.get("fingerprint") != self._source_fingerprint():
+                return False
+            self.name_to_id = cached["name_to_id"]
+            self.id_to_name = cached["id_to_name"]
+            self.player_stats = cached["player_stats"]
+            self.h2h_matches = cached["h2h_matches"]
+        except Exception as e:
+            print(f"Warning: ignoring player DB cache {path}: {e}")
+            return False
+        print(f"Loaded stats for {len(self.player_stats)} players (cached)")
+        return True
+    
+    def _save_cache(self):
+        """Persist the computed database so the next run skips the CSV rebuild."""
+        path = self.cache_path
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            dump({
+                "version": CACHE_VERSION,
+                "fingerprint": self._source_fingerprint(),
+                "name_to_id": self.name_to_id,
+                "id_to_name": self.id_to_name,
+                "player_stats": self.player_stats,
+                "h2h_matches": self.h2h_matches,
+            }, path)
+        except Exception as e:
+            print(f"Warning: could not write player DB cache {path}: {e}")
     
     def _build_database(self):
         """Build player statistics from raw match data."""
@@ -29,11 +92,12 @@ class PlayerStatsDB:
         
         # Build name to ID mapping (use most recent ID for each name)
         print("Building player name mapping...")
-        for _, row in matches.iterrows():
-            winner_name = str(row.get("winner_name", "")).strip()
-            winner_id = row.get("winner_id")
-            loser_name = str(row.get("loser_name", "")).strip()
-            loser_id = row.get("loser_id")
+        for winner_name, winner_id, loser_name, loser_id in zip(
+            matches["winner_name"].tolist(), matches["winner_id"].tolist(),
+            matches["loser_name"].tolist(), matches["loser_id"].tolist()
+        ):
+            winner_name = str(winner_name).strip()
+            loser_name = str(loser_name).strip()
             
             # Handle both string and integer IDs
             if winner_name and pd.notna(winner_id):
@@ -46,34 +110,47 @@ class PlayerStatsDB:
                 self.name_to_id[loser_name.lower()] = loser_id_str
                 self.id_to_name[loser_id_str] = loser_name
         
-        # Initialize Elo systems
-        elo = Elo(base=1500, k=24)
-        selo = SurfaceElo(base=1500, k=24)
+        # Initialize Elo systems over dense player indices
+        # (IDs handled as strings to cover both string and integer IDs)
+        winner_ids = matches["winner_id"].astype(str).to_numpy()
+        loser_ids = matches["loser_id"].astype(str).to_numpy()
+        codes, player_ids = pd.factorize(np.concatenate([winner_ids, loser_ids]))
+        winner_idx = codes[:len(matches)]
+        loser_idx = codes[len(matches):]
+        elo = Elo.from_ids(player_ids, base=1500, k=24)
+        selo = SurfaceElo.from_ids(player_ids, base=1500, k=24)
         
         # Track recent matches for win rate
         last_matches = defaultdict(list)
         
-        # Head-to-head tracker
-        h2h_matches = defaultdict(lambda: defaultdict(int))
+        # Head-to-head tracker: (id_a, id_b) sorted -> (wins_a, wins_b)
+        h2h_matches = {}
         
         # Process matches chronologically to build stats
         print("Computing player statistics...")
-        matches["surface"] = matches["surface"].fillna("Hard").astype(str).str.capitalize()
-        matches["surface"] = matches["surface"].apply(self._normalize_surface)
+        matches["surface"] = normalize_surfaces(matches["surface"])
         
-        for _, row in matches.iterrows():
-            surface = row["surface"]
-            # Handle both string and integer IDs
-            winner_id = str(row["winner_id"])
-            loser_id = str(row["loser_id"])
-            winner_age = row.get("winner_age")
-            loser_age = row.get("loser_age")
-            winner_ht = row.get("winner_ht")
-            loser_ht = row.get("loser_ht")
+        # Plain column lists - indexing these is far cheaper than a Series per row
+        surfaces = matches["surface"].tolist()
+        winner_ages = matches["winner_age"].tolist()
+        loser_ages = matches["loser_age"].tolist()
+        winner_hts = matches["winner_ht"].tolist()
+        loser_hts = matches["loser_ht"].tolist()
+        
+        for i in range(len(matches)):
+            w = winner_idx[i]
+            l = loser_idx[i]
+            surface = surfaces[i]
+            winner_id = player_ids[w]
+            loser_id = player_ids[l]
+            winner_age = winner_ages[i]
+            loser_age = loser_ages[i]
+            winner_ht = winner_hts[i]
+            loser_ht = loser_hts[i]
             
             # Update Elo
-            elo.update(winner_id, loser_id)
-            selo.update(surface, winner_id, loser_id)
+            elo.update(w, l)
+            selo.update(surface, w, l)
             
             # Update recent matches (keep last 50)
             last_matches[winner_id].append(1)
@@ -84,14 +161,20 @@ class PlayerStatsDB:
                 last_matches[loser_id].pop(0)
             
             # Update H2H
-            key = tuple(sorted([winner_id, loser_id]))
-            h2h_matches[key][winner_id] += 1
+            if winner_id < loser_id:
+                key = (winner_id, loser_id)
+                wins_a, wins_b = h2h_matches.get(key, (0, 0))
+                h2h_matches[key] = (wins_a + 1, wins_b)
+            else:
+                key = (loser_id, winner_id)
+                wins_a, wins_b = h2h_matches.get(key, (0, 0))
+                h2h_matches[key] = (wins_a, wins_b + 1)
             
             # Store latest stats for each player
-            winner_elo = elo.get(winner_id)
-            loser_elo = elo.get(loser_id)
-            winner_selo = selo.get(surface, winner_id)
-            loser_selo = selo.get(surface, loser_id)
+            winner_elo = elo.get(w)
+            loser_elo = elo.get(l)
+            winner_selo = selo.get(surface, w)
+            loser_selo = selo.get(surface, l)
             
             # Update player stats (keep most recent)
             if winner_id not in self.player_stats:
@@ -192,9 +275,12 @@ class PlayerStatsDB:
         if key not in self.h2h_matches:
             return 0.0
         
-        # Get wins for both players from the sorted key
-        p1_wins = self.h2h_matches[key].get(player1_id, 0)
-        p2_wins = self.h2h_matches[key].get(player2_id, 0)
+        # Wins are stored in sorted key order
+        wins_a, wins_b = self.h2h_matches[key]
+        if player1_id == key[0]:
+            p1_wins, p2_wins = wins_a, wins_b
+        else:
+            p1_wins, p2_wins = wins_b, wins_a
         total = p1_wins + p2_wins
         
         if total == 0:
@@ -224,3 +310,8 @@ class PlayerStatsDB:
         else:
             return self.player_stats[player_id].get("elo", 1500.0)
 
+
+@lru_cache(maxsize=None)
+def get_player_db(raw_data_dir="data/raw"):
+    """Process-wide PlayerStatsDB for raw_data_dir (built or loaded from cache once)."""
+    return PlayerStatsDB(raw_data_dir=raw_data_dir)
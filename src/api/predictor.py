@@ -2,9 +2,13 @@
 Prediction utility for web app - builds feature vectors and runs predictions.
 """
 
+import threading
+import numpy as np
 import pandas as pd
+from functools import lru_cache
 from joblib import load
 from pathlib import Path
+from typing import Any, Dict
 
 # Features used by the models (must match train_common.py)
 FEATURES = [
@@ -13,12 +17,43 @@ FEATURES = [
     "is_clay", "is_grass", "is_hard", "is_indoor", "best_of_5",
     "round_code", "tourney_level_code"
 ]
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURES)}
+
+# Player-relative features that flip sign when player1 and player2 are swapped
+DIFF_FEATURES = ["elo_diff", "surface_elo_diff", "age_diff", "height_diff",
+                 "recent_win_rate_diff", "h2h_winrate_diff"]
+_DIFF_COLUMNS = [FEATURE_INDEX[name] for name in DIFF_FEATURES]
+
+
+# Model name -> pickle filename inside models_dir
+MODEL_FILES = {
+    "random_forest": "rf_model.pkl",
+    "decision_tree": "tree_model.pkl",
+    "xgboost": "xgb_model.pkl"
+}
+
+# Models whose pickles are memory-mapped on load. Their numpy arrays (tree node
+# tables, imputer statistics) become read-only views shared through the page cache,
+# which is fine because predict never writes to them. XGBoost pipelines keep the
+# booster as a raw byte blob rather than ndarrays, so mapping gains nothing there
+# and they are loaded normally.
+MMAP_MODELS = {"random_forest", "decision_tree"}
+
+# Loaded models shared by every MatchPredictor in the process, keyed by pickle path
+# (None marks a missing file so it is only reported once)
+_MODEL_CACHE: Dict[str, Any] = {}
+_MODEL_LOCK = threading.Lock()
 
 
 class MatchPredictor:
     """Predict match outcomes using trained models."""
     
-    def __init__(self, models_dir=None):
+    def __init__(self, models_dir=None, model_names=None):
+        """
+        Args:
+            models_dir: Directory with the model pickles (defaults to config MODELS_DIR)
+            model_names: Subset of MODEL_FILES keys to use (default: all)
+        """
         if models_dir is None:
             # Try to import from config, fallback to relative path
             try:
@@ -30,24 +65,51 @@ class MatchPredictor:
         else:
             self.models_dir = Path(models_dir)
         
-        self.models = {}
-        self._load_models()
+        self.model_names = list(MODEL_FILES) if model_names is None else list(model_names)
     
-    def _load_models(self):
-        """Load all trained models."""
-        model_files = {
-            "random_forest": "rf_model.pkl",
-            "decision_tree": "tree_model.pkl",
-            "xgboost": "xgb_model.pkl"
-        }
-        
-        for name, filename in model_files.items():
-            model_path = self.models_dir / filename
+    def _get_model(self, name):
+        """
+        Return the named model, loading it into the process-wide cache on first use.
+        
+        Args:
+            name: Key from MODEL_FILES
+        
+        Returns:
+            Loaded model, or None if its pickle does not exist
+        """
+        model_path = self.models_dir / MODEL_FILES[name]
+        key = str(model_path)
+        if key in _MODEL_CACHE:
+            return _MODEL_CACHE[key]
+        
+        with _MODEL_LOCK:
+            # Another thread may have loaded it while we waited
+            if key in _MODEL_CACHE:
+                return _MODEL_CACHE[key]
+            
             if model_path.exists():
                 print(f"Loading {name} model from {model_path}...")
-                self.models[name] = load(model_path)
+                mmap_mode = "r" if name in MMAP_MODELS else None
+                model = load(model_path, mmap_mode=mmap_mode)
             else:
                 print(f"Warning: {model_path} not found")
+                model = None
+            _MODEL_CACHE[key] = model
+            return model
+    
+    @property
+    def models(self):
+        """Available models by name (loaded lazily on first access)."""
+        models = {}
+        for name in self.model_names:
+            model = self._get_model(name)
+            if model is not None:
+                models[name] = model
+        return models
+    
+    def preload(self):
+        """Load all models now instead of on the first prediction."""
+        return self.models
     
     def build_features(self, player1_stats, player2_stats, surface="Hard", 
                       best_of_5=False, round_code=7, tourney_level_code=2, h2h_diff=0.0):
@@ -62,7 +124,35 @@ class MatchPredictor:
             round_code: Round code (1=R128, 7=Final)
             tourney_level_code: Tournament level (1=C/F, 2=A, 3=M, 4=G)
             h2h_diff: Head-to-head winrate difference (player1 - player2)
+        
+        Returns:
+            (1, n_features) float64 array in FEATURES order
+        """
+        x = np.empty((1, len(FEATURES)), dtype=np.float64)
+        self._fill_features(x[0], player1_stats, player2_stats, surface, best_of_5,
+                            round_code, tourney_level_code, h2h_diff)
+        return x
+    
+    def build_features_batch(self, matchups):
+        """
+        Build feature rows for many matches into one preallocated array.
+        
+        Args:
+            matchups: List of dicts of build_features keyword arguments
+                     (player1_stats and player2_stats required)
+        
+        Returns:
+            (len(matchups), n_features) float64 array in FEATURES order,
+            ready to pass to predict_batch
         """
+        X = np.empty((len(matchups), len(FEATURES)), dtype=np.float64)
+        for i, matchup in enumerate(matchups):
+            self._fill_features(X[i], **matchup)
+        return X
+    
+    def _fill_features(self, row, player1_stats, player2_stats, surface="Hard",
+                       best_of_5=False, round_code=7, tourney_level_code=2, h2h_diff=0.0):
+        """Write one match's features into row (a length-n_features view) in FEATURES order."""
         # Get surface-specific Elo or fallback to overall Elo
         p1_surface_elo = player1_stats.get("surface_elo", {}).get(surface)
         if p1_surface_elo is None:
@@ -87,79 +177,115 @@ class MatchPredictor:
         # Indoor encoding (default to 0/outdoor if not specified)
         is_indoor = 0  # Default to outdoor
         
-        features = {
-            "elo_diff": elo_diff,
-            "surface_elo_diff": surface_elo_diff,
-            "age_diff": age_diff,
-            "height_diff": height_diff,
-            "recent_win_rate_diff": recent_win_rate_diff,
-            "h2h_winrate_diff": h2h_diff,
-            "is_clay": is_clay,
-            "is_grass": is_grass,
-            "is_hard": is_hard,
-            "is_indoor": is_indoor,
-            "best_of_5": 1 if best_of_5 else 0,
-            "round_code": round_code,
-            "tourney_level_code": tourney_level_code
-        }
-        
-        # Convert to DataFrame with features in the EXACT order expected by the model
+        # Fill the row in the EXACT order expected by the model
         # This is critical because sklearn Pipelines expect features in training order
-        features_df = pd.DataFrame([features])[FEATURES]
-        return features_df
+        row[:] = (  # Same order as FEATURES
+            elo_diff, surface_elo_diff, age_diff, height_diff,
+            recent_win_rate_diff, h2h_diff,
+            is_clay, is_grass, is_hard, is_indoor, 1 if best_of_5 else 0,
+            round_code, tourney_level_code,
+        )
     
     def predict(self, features_df, enforce_symmetry=True):
         """
         Run predictions with all loaded models.
         
         Args:
-            features_df: DataFrame with features for prediction
+            features_df: Feature row from build_features (array or DataFrame with FEATURES columns)
             enforce_symmetry: If True, enforce symmetry by averaging with swapped prediction
         
         Returns:
             Dictionary with model names as keys and probability of player1 winning as values.
         """
-        predictions = {}
+        return self.predict_batch([features_df], enforce_symmetry=enforce_symmetry)[0]
+    
+    def predict_batch(self, features_dfs, enforce_symmetry=True):
+        """
+        Run predictions for many matches with one model call per model.
+        
+        Args:
+            features_dfs: List of feature rows from build_features ((1, n_features) arrays;
+                         DataFrames with FEATURES columns are also accepted), or a
+                         (B, n_features) array from build_features_batch
+            enforce_symmetry: If True, enforce symmetry by averaging with swapped prediction
+        
+        Returns:
+            List of prediction dictionaries (same order as features_dfs), each with model
+            names as keys and probability of player1 winning as values.
+        """
+        n = len(features_dfs)
+        predictions = [{} for _ in range(n)]
+        
+        for model_name, probs in self.predict_proba_batch(features_dfs, enforce_symmetry).items():
+            # One tolist() per model instead of boxing each element separately
+            values = probs.tolist() if probs is not None else [None] * n
+            for prediction, value in zip(predictions, values):
+                prediction[model_name] = value
+        
+        return predictions
+    
+    def predict_proba_batch(self, features_dfs, enforce_symmetry=True):
+        """
+        Run predictions for many matches, keeping each model's output as an array.
+        
+        Args:
+            features_dfs: Same as predict_batch
+            enforce_symmetry: If True, enforce symmetry by averaging with swapped prediction
+        
+        Returns:
+            Dictionary of model name -> float64 array of player1 win probabilities
+            (same order as features_dfs), or None if that model failed.
+        """
+        n = len(features_dfs)
+        if n == 0:
+            return {}
         
-        for model_name, model in self.models.items():
+        X = np.vstack([
+            f[FEATURES].to_numpy(dtype=np.float64) if isinstance(f, pd.DataFrame) else f
+            for f in features_dfs
+        ])
+        if enforce_symmetry:
+            # Create swapped features (flip all difference features) and score them in
+            # the same call: rows [0, n) are original, rows [n, 2n) are swapped
+            swapped = X.copy()
+            swapped[:, _DIFF_COLUMNS] = -swapped[:, _DIFF_COLUMNS]
+            X = np.vstack([X, swapped])
+        
+        # Models fitted on DataFrames select columns by name - build that frame once per batch
+        models = self.models
+        X_frame = None
+        if any(hasattr(model, "feature_names_in_") for model in models.values()):
+            X_frame = pd.DataFrame(X, columns=FEATURES, copy=False)
+        
+        results = {}
+        
+        for model_name, model in models.items():
+            X_in = X_frame if hasattr(model, "feature_names_in_") else X
             try:
                 if hasattr(model, "predict_proba"):
-                    proba = model.predict_proba(features_df)[0]
                     # Probability that player1 wins (class 1)
-                    p1_win_prob = float(proba[1])
+                    probs = model.predict_proba(X_in)[:, 1]
                 else:
-                    pred = model.predict(features_df)[0]
-                    p1_win_prob = float(pred)
+                    probs = model.predict(X_in)
+                probs = probs.astype(float)
+                
+                p1_win_probs = probs[:n]
                 
                 # Enforce symmetry: if we predict p1 wins with prob p, 
                 # we should also predict p2 wins with prob (1-p) when features are swapped
-                # To enforce this, we average with the complement
+                # p2 wins in swapped = p1 wins in original, so average with its complement
                 if enforce_symmetry:
-                    # Create swapped features (flip all difference features)
-                    swapped_features = features_df.copy()
-                    diff_features = ["elo_diff", "surface_elo_diff", "age_diff", "height_diff", 
-                                    "recent_win_rate_diff", "h2h_winrate_diff"]
-                    for feat in diff_features:
-                        if feat in swapped_features.columns:
-                            swapped_features[feat] = -swapped_features[feat]
-                    
-                    # Get prediction for swapped features
-                    if hasattr(model, "predict_proba"):
-                        swapped_proba = model.predict_proba(swapped_features)[0]
-                        p2_win_prob_swapped = float(swapped_proba[1])  # p2 wins in swapped = p1 wins in original
-                    else:
-                        swapped_pred = model.predict(swapped_features)[0]
-                        p2_win_prob_swapped = float(swapped_pred)
-                    
-                    # Enforce symmetry: p1_prob + p2_prob_swapped should = 1
-                    # Average the two predictions to ensure symmetry
-                    p1_win_prob_symmetric = (p1_win_prob + (1.0 - p2_win_prob_swapped)) / 2.0
-                    p1_win_prob = p1_win_prob_symmetric
+                    p1_win_probs = (p1_win_probs + (1.0 - probs[n:])) / 2.0
                 
-                predictions[model_name] = p1_win_prob
+                results[model_name] = p1_win_probs
             except Exception as e:
                 print(f"Error predicting with {model_name}: {e}")
-                predictions[model_name] = None
+                results[model_name] = None
         
-        return predictions
+        return results
+
 
+@lru_cache(maxsize=None)
+def get_predictor(models_dir=None):
+    """Process-wide MatchPredictor for models_dir (models are loaded once)."""
+    return MatchPredictor(models_dir=models_dir)
@@ -0,0 +1,32 @@
+"""
+Optional Numba JIT decorator.
+
+Uses numba.njit when numba is installed, otherwise returns the function unchanged
+so the same kernels run as plain Python.
+"""
+
+try:
+    from numba import njit as _numba_njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    _numba_njit = None
+    NUMBA_AVAILABLE = False
+
+
+def njit(*args, **kwargs):
+    """
+    Drop-in replacement for numba.njit.
+
+    Supports both bare (@njit) and configured (@njit(cache=True)) usage.
+    """
+    if NUMBA_AVAILABLE:
+        return _numba_njit(*args, **kwargs)
+
+    # Bare decorator: @njit
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+        return args[0]
+
+    # Configured decorator: @njit(cache=True, ...)
+    def decorator(func):
+        return func
+    return decorator
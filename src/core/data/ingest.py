@@ -1,16 +1,132 @@
-
+import os
 import pandas as pd
 import glob
+from functools import lru_cache
 from pathlib import Path
+from joblib import Memory
+
+try:
+    import pyarrow.parquet as pq  # Optional - Parquet copy of the model-ready dataset
+    PARQUET_AVAILABLE = True
+except ImportError:
+    pq = None
+    PARQUET_AVAILABLE = False
+
+# Columns used downstream (engineer.build_match_dataset, PlayerStatsDB); "indoor" is optional
+MATCH_COLUMNS = [
+    "tourney_id", "tourney_name", "tourney_date", "tourney_level", "surface",
+    "round", "best_of", "winner_id", "winner_name", "winner_age", "winner_ht",
+    "loser_id", "loser_name", "loser_age", "loser_ht", "indoor"
+]
+
+# Explicit types so each file parses the same way (IDs stay strings whether they
+# look numeric or not); tourney_date / best_of are left to inference
+MATCH_DTYPES = {
+    "tourney_id": "str", "tourney_name": "str", "tourney_level": "str",
+    "surface": "str", "round": "str", "indoor": "str",
+    "winner_id": "str", "winner_name": "str", "loser_id": "str", "loser_name": "str",
+    "winner_age": "float64", "winner_ht": "float64",
+    "loser_age": "float64", "loser_ht": "float64",
+}
+
+# On-disk cache for load_matches (and train_common), so repeated pipeline runs skip
+# re-parsing unchanged CSVs. Anchored at the repo root, not the working directory
+CACHE_DIR = Path(__file__).resolve().parents[3] / "data" / "processed" / "_cache"
+
+@lru_cache(maxsize=None)
+def cache_memory() -> Memory:
+    """joblib Memory on CACHE_DIR; the directory is created on first use, not on import."""
+    return Memory(CACHE_DIR, verbose=0)
+
+# Bump when what load_matches returns changes (dtypes, parsing), so older cached results are not reused
+LOAD_MATCHES_VERSION = 1
+
+def load_matches(raw_dir: str, columns=MATCH_COLUMNS, use_cache=True) -> pd.DataFrame:
+    """
+    Load all ATP match files in raw_dir into one DataFrame.
 
-def load_matches(raw_dir: str) -> pd.DataFrame:
+    Args:
+        raw_dir: Directory containing atp_matches_*.csv
+        columns: Columns to read (missing ones are skipped); None reads every column
+        use_cache: Reuse the result of a previous call while the match files are unchanged
+    """
     # Look for Jeff Sackmann files in data/raw/
     files = sorted(glob.glob(str(Path(raw_dir) / "atp_matches_*.csv")))
     if not files:
         raise FileNotFoundError("No atp_matches_*.csv files found in data/raw/.")
-    df = pd.concat((pd.read_csv(f) for f in files), ignore_index=True)
+    columns = list(columns) if columns is not None else None
+    if not use_cache:
+        return _load_matches(files, columns)
+    # Path, size and mtime of every file form the cache key, so added or edited files are re-read
+    signature = []
+    for f in files:
+        st = os.stat(f)
+        signature.append((str(Path(f).resolve()), st.st_size, st.st_mtime_ns))
+    return cache_memory().cache(_load_matches_cached)(tuple(signature), columns, LOAD_MATCHES_VERSION)
+
+def _load_matches_cached(files_signature, columns, version):
+    """Cached load_matches body (sizes, mtimes and version only serve as cache key)."""
+    return _load_matches([f for f, _, _ in files_signature], columns)
+
+def _load_matches(files, columns):
+    """Read and concatenate the match CSVs."""
+    usecols = None
+    if columns is not None:
+        wanted = set(columns)
+        usecols = lambda c: c in wanted
+    df = pd.concat(
+        (pd.read_csv(f, usecols=usecols, dtype=MATCH_DTYPES, engine="c") for f in files),
+        ignore_index=True
+    )
     return df
 
+def model_ready_source(csv_path) -> Path:
+    """
+    File to read the model-ready dataset from: the Parquet copy next to csv_path when
+    pyarrow is installed and that copy is at least as new as the CSV, else the CSV.
+    """
+    csv_path = Path(csv_path)
+    parquet_path = csv_path.with_suffix(".parquet")
+    if PARQUET_AVAILABLE and parquet_path.exists():
+        if not csv_path.exists() or parquet_path.stat().st_mtime_ns >= csv_path.stat().st_mtime_ns:
+            return parquet_path
+    return csv_path
+
+def load_model_ready(csv_path, columns=None) -> pd.DataFrame:
+    """
+    Load the model-ready dataset (Parquet copy preferred, see model_ready_source).
+
+    Args:
+        csv_path: Path to matches_model_ready.csv
+        columns: Columns to read (missing ones are skipped); None reads every column
+    """
+    source = model_ready_source(csv_path)
+    if source.suffix == ".parquet":
+        if columns is not None:
+            available = set(pq.ParquetFile(source).schema_arrow.names)
+            columns = [c for c in columns if c in available]
+        return pd.read_parquet(source, columns=columns)
+    usecols = None
+    if columns is not None:
+        wanted = set(columns)
+        usecols = lambda c: c in wanted
+    return pd.read_csv(source, usecols=usecols)
+
+def save_model_ready(df: pd.DataFrame, csv_path) -> list:
+    """
+    Write the model-ready dataset as CSV, plus a snappy Parquet copy when pyarrow is available.
+
+    Returns:
+        List of written paths
+    """
+    df.to_csv(csv_path, index=False)
+    written = [str(csv_path)]
+    if PARQUET_AVAILABLE:
+        parquet_path = Path(csv_path).with_suffix(".parquet")
+        df.to_parquet(parquet_path, engine="pyarrow", compression="snappy", index=False)
+        written.append(str(parquet_path))
+    return written
+
 def load_players(raw_dir: str) -> pd.DataFrame:
     p = Path(raw_dir) / "atp_players.csv"
     if not p.exists():
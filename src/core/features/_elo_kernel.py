@@ -0,0 +1,102 @@
+"""
+Numeric kernel for the chronological Elo pass over the match history.
+
+Players and surfaces are passed as integer codes so the loop can be JIT-compiled
+(falls back to plain Python when numba is not installed). The math mirrors
+Elo / SurfaceElo in elo.py exactly.
+"""
+
+import numpy as np
+from src.core._njit import njit
+from src.core.features.elo import INV_400
+
+
+@njit(cache=True)
+def elo_pass(winner_idx, loser_idx, surface_idx, n_players, n_surfaces, base, k):
+    """
+    Record pre-match overall and surface Elo for every match, then apply the update.
+
+    Args:
+        winner_idx: int64 array of winner player codes (chronological order)
+        loser_idx: int64 array of loser player codes
+        surface_idx: int64 array of surface codes
+        n_players: Number of distinct player codes
+        n_surfaces: Number of surface tables
+        base: Starting rating
+        k: K-factor
+
+    Returns:
+        Tuple of (p1_elo, p2_elo, p1_surface_elo, p2_surface_elo) float64 arrays
+    """
+    n = winner_idx.shape[0]
+    rating = np.full(n_players, base, dtype=np.float64)
+    surface_rating = np.full((n_surfaces, n_players), base, dtype=np.float64)
+
+    p1_elo = np.empty(n, dtype=np.float64)
+    p2_elo = np.empty(n, dtype=np.float64)
+    p1_selo = np.empty(n, dtype=np.float64)
+    p2_selo = np.empty(n, dtype=np.float64)
+
+    for i in range(n):
+        w = winner_idx[i]
+        l = loser_idx[i]
+        s = surface_idx[i]
+
+        ra = rating[w]
+        rb = rating[l]
+        p1_elo[i] = ra
+        p2_elo[i] = rb
+        ea = 1.0 / (1.0 + 10.0 ** ((rb - ra) * INV_400))
+        delta = k * (1.0 - ea)
+        rating[w] = ra + delta
+        rating[l] = rb - delta
+
+        ra = surface_rating[s, w]
+        rb = surface_rating[s, l]
+        p1_selo[i] = ra
+        p2_selo[i] = rb
+        ea = 1.0 / (1.0 + 10.0 ** ((rb - ra) * INV_400))
+        delta = k * (1.0 - ea)
+        surface_rating[s, w] = ra + delta
+        surface_rating[s, l] = rb - delta
+
+    return p1_elo, p2_elo, p1_selo, p2_selo
+
+
+@njit(cache=True)
+def recent_win_rates(winner_idx, loser_idx, n_players, window):
+    """
+    Win rate over each player's last `window` matches, via a per-player ring buffer.
+
+    Args:
+        winner_idx: int64 array of winner player codes (chronological order)
+        loser_idx: int64 array of loser player codes
+        n_players: Number of distinct player codes
+        window: Number of most recent matches to keep per player
+
+    Returns:
+        float64 array of win rates indexed by player code (0.5 for players with no matches)
+    """
+    buf = np.zeros((n_players, window), dtype=np.int8)
+    cnt = np.zeros(n_players, dtype=np.int32)
+    head = np.zeros(n_players, dtype=np.int32)
+    # Running sum of the buffered results, so no reduction is needed at the end
+    wins = np.zeros(n_players, dtype=np.int32)
+
+    for i in range(2 * winner_idx.shape[0]):
+        # Winner then loser for each match
+        if i % 2 == 0:
+            pid = winner_idx[i // 2]
+            won = 1
+        else:
+            pid = loser_idx[i // 2]
+            won = 0
+        # Slot being overwritten holds the result that falls out of the window (0 until full)
+        wins[pid] += won - buf[pid, head[pid]]
+        buf[pid, head[pid]] = won
+        head[pid] = (head[pid] + 1) % window
+        if cnt[pid] < window:
+            cnt[pid] += 1
+
+    rates = np.where(cnt > 0, wins / np.maximum(cnt, 1), 0.5)
+    return rates
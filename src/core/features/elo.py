@@ -1,5 +1,9 @@
 
 from collections import defaultdict
+import numpy as np
+
+# Rating gap scale (400 points = 10x odds), applied as a multiply
+INV_400 = 1.0 / 400.0
 
 class Elo:
     def __init__(self, base=1500.0, k=24.0):
@@ -7,15 +11,29 @@ class Elo:
         self.k = k
         self.rating = defaultdict(lambda: base)
 
+    @classmethod
+    def from_ids(cls, ids, base=1500.0, k=24.0):
+        """
+        Elo backed by a float64 array for a known set of players.
+
+        Players are then addressed by their integer index into ids
+        (e.g. codes from pd.factorize) instead of by id.
+        """
+        elo = cls(base=base, k=k)
+        elo.rating = np.full(len(ids), base, dtype=np.float64)
+        return elo
+
     def expected(self, ra, rb):
-        return 1.0 / (1.0 + 10 ** ((rb - ra) / 400.0))
+        return 1.0 / (1.0 + 10.0 ** ((rb - ra) * INV_400))
 
     def update(self, winner, loser):
         ra = self.rating[winner]
         rb = self.rating[loser]
-        ea = self.expected(ra, rb)
-        self.rating[winner] = ra + self.k * (1 - ea)
-        self.rating[loser]  = rb + self.k * (0 - (1 - ea))
+        # Inlined expected(); the winner gains exactly what the loser drops
+        ea = 1.0 / (1.0 + 10.0 ** ((rb - ra) * INV_400))
+        delta = self.k * (1.0 - ea)
+        self.rating[winner] = ra + delta
+        self.rating[loser]  = rb - delta
 
     def get(self, player_id):
         return float(self.rating[player_id])
@@ -24,6 +42,19 @@ class SurfaceElo:
     SURFACES = ("Hard", "Clay", "Grass")
     def __init__(self, base=1500.0, k=24.0):
         self.tables = {s: Elo(base=base, k=k) for s in self.SURFACES}
+
+    @classmethod
+    def from_ids(cls, ids, base=1500.0, k=24.0):
+        """
+        SurfaceElo backed by one (n_surfaces, n_players) array; players are addressed
+        by integer index into ids. Each surface table's ratings are a row view of it.
+        """
+        selo = cls(base=base, k=k)
+        selo.ratings = np.full((len(cls.SURFACES), len(ids)), base, dtype=np.float64)
+        for i, s in enumerate(cls.SURFACES):
+            selo.tables[s].rating = selo.ratings[i]
+        return selo
+
     def update(self, surface, winner, loser):
         surf = surface if surface in self.tables else "Hard"
         self.tables[surf].update(winner, loser)
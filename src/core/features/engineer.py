@@ -1,17 +1,41 @@
+import time
 import pandas as pd
 import numpy as np
-from tqdm import tqdm
-from .elo import Elo, SurfaceElo
-
-def _normalize_surface(s):
-    """Normalize surface strings to Hard, Clay, or Grass."""
-    if pd.isna(s):
-        return "Hard"
-    s = str(s).strip().capitalize()
-    if s.startswith("H"): return "Hard"
-    if s.startswith("C"): return "Clay"
-    if s.startswith("G"): return "Grass"
-    return "Hard"
+from .elo import SurfaceElo
+from ._elo_kernel import elo_pass, recent_win_rates
+
+# Surface table index used by the Elo kernel (order matches SurfaceElo.SURFACES)
+SURFACE_CODES = {s: i for i, s in enumerate(SurfaceElo.SURFACES)}
+
+# Round & tournament level encodings
+ROUND_CODES = {"R128": 1, "R64": 2, "R32": 3, "R16": 4, "QF": 5, "SF": 6, "F": 7, "RR": 3, "BR": 7}
+LEVEL_CODES = {"G": 4, "M": 3, "A": 2, "C": 1, "F": 1}
+
+# Narrow on-disk dtypes for the model-ready dataset. The float features are cast to
+# float32, which is what training (load_data) and the tree models use anyway.
+MODEL_READY_DTYPES = {
+    "p1_wins": "int8",
+    "elo_diff": "float32", "surface_elo_diff": "float32", "age_diff": "float32",
+    "height_diff": "float32", "recent_win_rate_diff": "float32", "h2h_winrate_diff": "float32",
+    "is_clay": "int8", "is_grass": "int8", "is_hard": "int8", "is_indoor": "int8",
+    "best_of_5": "int8", "round_code": "int8", "tourney_level_code": "int8",
+}
+
+def downcast_model_ready(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast the feature/target columns of a build_match_dataset frame to MODEL_READY_DTYPES."""
+    return df.astype({c: t for c, t in MODEL_READY_DTYPES.items() if c in df.columns})
+
+def _encode(values, mapping, default):
+    """Map values through mapping (unknown -> default) via categorical codes and one array gather."""
+    codes = pd.Categorical(values, categories=list(mapping)).codes
+    # Unknown values get code -1, which picks the trailing default
+    lookup = np.array(list(mapping.values()) + [default], dtype=np.int64)
+    return lookup[codes]
+
+def normalize_surfaces(surfaces: pd.Series) -> pd.Series:
+    """Normalize surface strings to Hard, Clay, or Grass by first letter (missing/unknown -> Hard)."""
+    first = surfaces.fillna("").astype(str).str.strip().str[:1].str.upper()
+    return first.map({"H": "Hard", "C": "Clay", "G": "Grass"}).fillna("Hard")
 
 def build_match_dataset(df_matches: pd.DataFrame) -> pd.DataFrame:
     # Keep only relevant columns
@@ -24,112 +48,71 @@ def build_match_dataset(df_matches: pd.DataFrame) -> pd.DataFrame:
     if "indoor" in df_matches.columns:
         keep.append("indoor")
     df = df_matches[keep].copy()
-    df["surface"] = df["surface"].map(_normalize_surface)
+    df["surface"] = normalize_surfaces(df["surface"])
     df["best_of_5"] = (df["best_of"] == 5).astype(int)
 
     # Round & level encoding
-    round_map = {"R128": 1, "R64": 2, "R32": 3, "R16": 4, "QF": 5, "SF": 6, "F": 7, "RR": 3, "BR": 7}
-    level_map = {"G": 4, "M": 3, "A": 2, "C": 1, "F": 1}
-    df["round_code"] = df["round"].map(round_map).fillna(3).astype(int)
-    df["tourney_level_code"] = df["tourney_level"].map(level_map).fillna(2).astype(int)
-
-    # Elo trackers
-    elo = Elo(base=1500, k=24)
-    selo = SurfaceElo(base=1500, k=24)
-
-    # Head-to-head tracker
-    h2h = {}
-
+    df["round_code"] = _encode(df["round"], ROUND_CODES, default=3)
+    df["tourney_level_code"] = _encode(df["tourney_level"], LEVEL_CODES, default=2)
+
+    # Encode players and surfaces as integer codes for the Elo kernel
+    # (IDs handled as strings to cover both string and integer IDs)
+    p1_ids = df["winner_id"].astype(str).to_numpy()
+    p2_ids = df["loser_id"].astype(str).to_numpy()
+    n = len(df)
+    codes, uniques = pd.factorize(np.concatenate([p1_ids, p2_ids]))
+    w_idx = codes[:n].astype(np.int64)
+    l_idx = codes[n:].astype(np.int64)
+    surface_idx = pd.Categorical(df["surface"], categories=SurfaceElo.SURFACES).codes.astype(np.int64)
+
+    start = time.perf_counter()
+    p1_elo, p2_elo, p1_selo, p2_selo = elo_pass(
+        w_idx, l_idx, surface_idx, len(uniques), len(SurfaceElo.SURFACES), 1500.0, 24.0
+    )
+
+    # Head-to-head winrate from prior meetings of the same pair
+    pair = np.minimum(w_idx, l_idx) * len(uniques) + np.maximum(w_idx, l_idx)
+    total_meetings = pd.Series(pair).groupby(pair).cumcount().to_numpy()
+    w_wins = pd.Series(pair).groupby([pair, w_idx]).cumcount().to_numpy()
+    l_wins = total_meetings - w_wins
+    safe_total = np.where(total_meetings == 0, 1, total_meetings)
+    h2h_diff = np.where(total_meetings == 0, 0.0, w_wins / safe_total - l_wins / safe_total)
+
+    # Recent form: win rate over each player's last 50 matches in the dataset
+    recent = recent_win_rates(w_idx, l_idx, len(uniques), 50)
+    print(f"Engineered features for {n} matches in {time.perf_counter() - start:.2f}s")
+
+    # Feature columns as plain arrays (winner = p1); the output frame is built once below
+    one_hot = np.eye(len(SurfaceElo.SURFACES), dtype=np.int64)[surface_idx]
     cols = {
-        "p1_id": [], "p2_id": [],
-        "p1_elo": [], "p2_elo": [],
-        "p1_surface_elo": [], "p2_surface_elo": [],
-        "h2h_winrate_diff": []
+        "p1_id": p1_ids,
+        "p2_id": p2_ids,
+        "p1_wins": np.ones(n, dtype=np.int64),
+        "elo_diff": p1_elo - p2_elo,
+        "surface_elo_diff": p1_selo - p2_selo,
+        "age_diff": df["winner_age"].fillna(0).to_numpy() - df["loser_age"].fillna(0).to_numpy(),
+        "height_diff": df["winner_ht"].fillna(0).to_numpy() - df["loser_ht"].fillna(0).to_numpy(),
+        "recent_win_rate_diff": recent[w_idx] - recent[l_idx],
+        "h2h_winrate_diff": h2h_diff,
+        # One-hot surface flags from the surface codes (columns follow SurfaceElo.SURFACES)
+        "is_clay": one_hot[:, SURFACE_CODES["Clay"]],
+        "is_grass": one_hot[:, SURFACE_CODES["Grass"]],
+        "is_hard": one_hot[:, SURFACE_CODES["Hard"]],
     }
 
-    last_matches = {}
-    pbar = tqdm(total=len(df), desc="Engineering features")
-
-    for _, row in df.iterrows():
-        s = row["surface"]
-        # Handle both string and integer IDs
-        w = str(row["winner_id"]); l = str(row["loser_id"])
-
-        # Get ELO values
-        w_elo = elo.get(w); l_elo = elo.get(l)
-        w_selo = selo.get(s, w); l_selo = selo.get(s, l)
-
-        # Head-to-head winrate
-        key = tuple(sorted((w, l)))
-        if key not in h2h:
-            h2h[key] = {w: 0, l: 0}
-        total_meetings = h2h[key][w] + h2h[key][l]
-
-        if total_meetings == 0:
-            h2h_diff = 0.0
-        else:
-            wr_w = h2h[key][w] / total_meetings
-            wr_l = h2h[key][l] / total_meetings
-            h2h_diff = wr_w - wr_l
-
-        # Store row
-        cols["p1_id"].append(w)
-        cols["p2_id"].append(l)
-        cols["p1_elo"].append(w_elo)
-        cols["p2_elo"].append(l_elo)
-        cols["p1_surface_elo"].append(w_selo)
-        cols["p2_surface_elo"].append(l_selo)
-        cols["h2h_winrate_diff"].append(h2h_diff)
-
-        # Update Elo and Head-to-Head
-        elo.update(w, l)
-        selo.update(s, w, l)
-        h2h[key][w] += 1
-
-        # Update recent form
-        for pid, won in [(w, 1), (l, 0)]:
-            arr = last_matches.get(pid, [])
-            arr.append(won)
-            if len(arr) > 50:
-                arr.pop(0)
-            last_matches[pid] = arr
-
-        pbar.update(1)
-    pbar.close()
-
-    # Merge feature columns
-    df = df.assign(**cols)
-
-    def recent_wr(pid):
-        arr = last_matches.get(pid, [])
-        return float(np.mean(arr)) if arr else 0.5
-
-    df["p1_recent_wr"] = df["p1_id"].map(recent_wr)
-    df["p2_recent_wr"] = df["p2_id"].map(recent_wr)
-
-    # Derived features
-    df["elo_diff"] = df["p1_elo"] - df["p2_elo"]
-    df["surface_elo_diff"] = df["p1_surface_elo"] - df["p2_surface_elo"]
-    df["age_diff"] = df["winner_age"].fillna(0) - df["loser_age"].fillna(0)
-    df["height_diff"] = df["winner_ht"].fillna(0) - df["loser_ht"].fillna(0)
-    df["recent_win_rate_diff"] = df["p1_recent_wr"] - df["p2_recent_wr"]
-
-    df["is_clay"] = (df["surface"] == "Clay").astype(int)
-    df["is_grass"] = (df["surface"] == "Grass").astype(int)
-    df["is_hard"] = (df["surface"] == "Hard").astype(int)
-    
     # Indoor feature (if available)
     if "indoor" in df.columns:
         # Convert indoor column: "O" = outdoor (0), "I" = indoor (1), or boolean
-        df["is_indoor"] = df["indoor"].apply(
+        cols["is_indoor"] = df["indoor"].apply(
             lambda x: 1 if (str(x).upper() == "I" or str(x).upper() == "INDOOR" or x == True or x == 1) 
             else 0
-        ).astype(int)
+        ).astype(int).to_numpy()
     else:
-        df["is_indoor"] = 0  # Default to outdoor if not available
+        cols["is_indoor"] = np.zeros(n, dtype=np.int64)  # Default to outdoor if not available
 
-    # Winner rows
-    df["p1_wins"] = 1
+    for col in ("best_of_5", "round_code", "tourney_level_code", "tourney_id",
+                "tourney_name", "tourney_date", "surface", "round"):
+        cols[col] = df[col].to_numpy()
 
     # Final column selection
     final = [
@@ -140,25 +123,27 @@ def build_match_dataset(df_matches: pd.DataFrame) -> pd.DataFrame:
         "surface", "round"
     ]
 
-    df = df[final]
-
     # ===============================
     # 🪞 MIRROR DATASET (add losing side)
     # ===============================
-    mirrored = df.copy()
-    mirrored["p1_id"], mirrored["p2_id"] = df["p2_id"], df["p1_id"]
-
-    # Flip sign for all difference features
-    mirrored["elo_diff"] = -df["elo_diff"]
-    mirrored["surface_elo_diff"] = -df["surface_elo_diff"]
-    mirrored["age_diff"] = -df["age_diff"]
-    mirrored["height_diff"] = -df["height_diff"]
-    mirrored["recent_win_rate_diff"] = -df["recent_win_rate_diff"]
-    mirrored["h2h_winrate_diff"] = -df["h2h_winrate_diff"]
-
-    mirrored["p1_wins"] = 0
-
-    # Combine original + mirrored
-    df = pd.concat([df, mirrored], ignore_index=True)
+    # Each column is built once as [winner rows, mirrored rows]: IDs swapped,
+    # difference features sign-flipped, everything else repeated.
+    mirror_diff = {
+        "elo_diff", "surface_elo_diff", "age_diff", "height_diff",
+        "recent_win_rate_diff", "h2h_winrate_diff"
+    }
+    swapped = {"p1_id": "p2_id", "p2_id": "p1_id"}
+    data = {}
+    for col in final:
+        values = cols[col]
+        if col in swapped:
+            mirrored = cols[swapped[col]]
+        elif col in mirror_diff:
+            mirrored = -values
+        elif col == "p1_wins":
+            mirrored = np.zeros_like(values)
+        else:
+            mirrored = values
+        data[col] = np.concatenate([values, mirrored])
 
-    return df
+    return pd.DataFrame(data, copy=False)
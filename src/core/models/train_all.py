@@ -0,0 +1,54 @@
+from joblib import Parallel, delayed, cpu_count
+from sklearn.pipeline import Pipeline
+from . import train_rf, train_tree, train_xgb
+from .train_common import (
+    load_data,
+    make_preprocessor,
+    split,
+    evaluate,
+    print_metrics,
+    save_model,
+)
+
+# (display name, classifier factory, output path)
+MODELS = [
+    ("🌲 Random Forest Model", train_rf.make_classifier, "models/rf_model.pkl"),
+    ("🎾 Decision Tree Model", train_tree.make_classifier, "models/tree_model.pkl"),
+    ("🚀 XGBoost Model", train_xgb.make_classifier, "models/xgb_model.pkl"),
+]
+
+def _fit(clf, Xtr_t, ytr, wtr):
+    clf.fit(Xtr_t, ytr, sample_weight=wtr)
+    return clf
+
+def main():
+    # 🧠 Load and split data with temporal weighting (same split as the single-model scripts)
+    X, y, sample_weights = load_data("data/processed/matches_model_ready.csv")
+    Xtr, Xte, ytr, yte, wtr, wte = split(X, y, sample_weights)
+
+    # 🧱 Fit the shared preprocessor once and hand every worker the transformed matrix
+    pre = make_preprocessor().fit(Xtr)
+    Xtr_t = pre.transform(Xtr)
+
+    # 🚀 Train all models in parallel; split the cores between them so the
+    # inner RF / XGBoost thread pools don't oversubscribe the machine
+    inner_jobs = max(1, cpu_count() // len(MODELS))
+    fitted = Parallel(n_jobs=len(MODELS), backend="loky")(
+        delayed(_fit)(make_classifier(n_jobs=inner_jobs), Xtr_t, ytr, wtr)
+        for _, make_classifier, _ in MODELS
+    )
+
+    for (name, _, path), clf in zip(MODELS, fitted):
+        # Same pipeline layout as the single-model scripts, so the predictor loads it unchanged
+        pipe = Pipeline([("pre", pre), ("clf", clf)])
+
+        # 📈 Evaluate and 🖨 print
+        results = evaluate(pipe, Xte, yte)
+        print_metrics(results, name)
+
+        # 💾 Save model
+        save_model(pipe, path)
+        print(f"✅ {path} saved")
+
+if __name__ == "__main__":
+    main()
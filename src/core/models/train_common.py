@@ -1,19 +1,21 @@
 
+import os
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import StratifiedShuffleSplit
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import accuracy_score, log_loss, roc_auc_score, classification_report, confusion_matrix
+from src.evaluation.metrics import evaluate_model
+from src.core.data.ingest import cache_memory, load_model_ready, model_ready_source
 from rich.console import Console
 from rich.table import Table
-import matplotlib.pyplot as plt
 
 console = Console()
 
 from joblib import dump
+from pathlib import Path
 FEATURES = ["elo_diff","surface_elo_diff","age_diff","height_diff","recent_win_rate_diff",
             "h2h_winrate_diff",
             "is_clay","is_grass","is_hard","is_indoor","best_of_5","round_code","tourney_level_code"]
@@ -22,7 +24,15 @@ NUMERIC = FEATURES
 TEST_SIZE = 0.2
 RANDOM_STATE = 42
 
-def load_data(csv_path: str, reference_date=None):
+# load_data and the fitted preprocessor go through ingest's on-disk cache_memory(), so
+# repeated training runs (and the RF / tree / XGB scripts on the same split) skip the
+# CSV parse, weighting and imputer/scaler fit. Run trainers sequentially - concurrent
+# writers can race.
+
+# Bump when what load_data returns changes, so cached results from older code are not reused
+LOAD_DATA_VERSION = 2
+
+def load_data(csv_path: str, reference_date=None, use_cache=True):
     """
     Load data and calculate temporal weights.
     
@@ -30,26 +40,43 @@ def load_data(csv_path: str, reference_date=None):
         csv_path: Path to processed matches CSV
         reference_date: Reference date for weighting (YYYYMMDD format). 
                        If None, uses max date in dataset.
+        use_cache: Reuse the result of a previous call while the CSV is unchanged
     
     Returns:
-        X (features), y (target), sample_weights
+        X (float32 array, columns in FEATURES order), y (target), sample_weights
     """
-    df = pd.read_csv(csv_path)
+    if not use_cache:
+        return _load_data(csv_path, reference_date)
+    # The file actually read (Parquet copy or CSV) plus its size + mtime form the
+    # cache key, so a rebuilt dataset is re-read
+    source = model_ready_source(csv_path)
+    st = source.stat()
+    return cache_memory().cache(_load_data_cached)(
+        str(Path(csv_path).resolve()), str(source.resolve()),
+        st.st_size, st.st_mtime_ns, reference_date, LOAD_DATA_VERSION)
+
+def _load_data_cached(csv_path, source, size, mtime_ns, reference_date, version):
+    """Cached load_data body (source, size, mtime_ns and version only serve as cache key)."""
+    return _load_data(csv_path, reference_date)
+
+def _load_data(csv_path, reference_date):
+    """Read the dataset and compute temporal sample weights."""
+    df = load_model_ready(csv_path, columns=FEATURES + [TARGET, "tourney_date"])
     
     # Calculate temporal weights based on match date
     if "tourney_date" in df.columns:
         # Convert dates to datetime
-        df["date"] = pd.to_datetime(df["tourney_date"], format="%Y%m%d", errors="coerce")
+        dates = pd.to_datetime(df["tourney_date"], format="%Y%m%d", errors="coerce")
         
         # Use max date as reference if not provided
         if reference_date is None:
-            reference_date = df["date"].max()
+            reference_date = dates.max()
         else:
             reference_date = pd.to_datetime(str(reference_date), format="%Y%m%d")
         
         # Calculate days since match (older = more days)
-        df["days_ago"] = (reference_date - df["date"]).dt.days
-        df["days_ago"] = df["days_ago"].fillna(365)  # Default to 1 year ago if date invalid
+        # Default to 1 year ago if date invalid
+        days_ago = (reference_date - dates).dt.days.fillna(365).to_numpy(dtype=np.float64)
         
         # Exponential decay weighting: weight = exp(-decay * days_ago / 365)
         # This gives:
@@ -58,22 +85,43 @@ def load_data(csv_path: str, reference_date=None):
         # - 1 year ago: weight ~0.25
         # - 2 years ago: weight ~0.06
         decay_rate = 0.693  # ln(2) so 1 year = 0.5 weight
-        df["sample_weight"] = np.exp(-decay_rate * df["days_ago"] / 365.0)
+        sample_weights = np.exp(-decay_rate * days_ago / 365.0)
         
         # Normalize weights so they average to 1.0 (helps with model stability)
-        df["sample_weight"] = df["sample_weight"] / df["sample_weight"].mean()
-        
-        sample_weights = df["sample_weight"].values
+        sample_weights /= sample_weights.mean()
     else:
         # No date column, use uniform weights
         sample_weights = np.ones(len(df))
     
-    return df[FEATURES], df[TARGET].astype(int), sample_weights
+    # One contiguous float32 matrix in FEATURES order: the trees / XGBoost work in float32
+    # anyway, so this skips a per-fit DataFrame -> array conversion and halves the bytes
+    X = np.ascontiguousarray(df[FEATURES].to_numpy(dtype=np.float32))
+    return X, df[TARGET].astype(int), sample_weights
 
 def make_preprocessor():
     numeric = Pipeline([("impute", SimpleImputer(strategy="median")),("scale", StandardScaler())])
+    if NUMERIC == FEATURES:
+        # All features numeric and already in order (load_data returns an array) -
+        # no column selection needed
+        return numeric
     return ColumnTransformer([("num", numeric, NUMERIC)])
 
+def make_pipeline(clf):
+    """
+    Preprocessor + classifier pipeline. The preprocessor fit is memoized on disk,
+    so models trained on the same split reuse the fitted imputer/scaler.
+    """
+    return Pipeline([("pre", make_preprocessor()), ("clf", clf)], memory=cache_memory())
+
+def save_model(pipe, path):
+    """Dump a trained pipeline (without the fit cache handle) to path."""
+    pipe.set_params(memory=None)
+    dump(pipe, path)
+
+def _take(a, idx):
+    """Rows idx of a DataFrame/Series (positional) or ndarray."""
+    return a.iloc[idx] if hasattr(a, "iloc") else a[idx]
+
 def split(X, y, sample_weights=None):
     """
     Split data into train/test sets.
@@ -86,39 +134,17 @@ def split(X, y, sample_weights=None):
     Returns:
         X_train, X_test, y_train, y_test, (w_train, w_test) if weights provided
     """
+    # One stratified shuffle (the same one train_test_split would draw), then every
+    # array is indexed with it directly
+    sss = StratifiedShuffleSplit(n_splits=1, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+    tr, te = next(sss.split(np.zeros(len(y)), y))
     if sample_weights is not None:
-        result = train_test_split(
-            X, y, sample_weights,
-            test_size=TEST_SIZE,
-            random_state=RANDOM_STATE,
-            stratify=y
-        )
-        return result[0], result[1], result[2], result[3], result[4], result[5]
-    else:
-        result = train_test_split(
-            X, y,
-            test_size=TEST_SIZE,
-            random_state=RANDOM_STATE,
-            stratify=y
-        )
-        return result[0], result[1], result[2], result[3]
+        w = np.asarray(sample_weights)
+        return _take(X, tr), _take(X, te), _take(y, tr), _take(y, te), w[tr], w[te]
+    return _take(X, tr), _take(X, te), _take(y, tr), _take(y, te)
 
 def evaluate(model, X_test, y_test):
-    y_pred = model.predict(X_test)
-    # 🪄 Make report a clean string
-    report_str = classification_report(y_test, y_pred)
-    out = {
-        "accuracy": accuracy_score(y_test, y_pred),
-        "report": report_str,
-        "confusion_matrix": confusion_matrix(y_test, y_pred).tolist()
-    }
-
-    if hasattr(model, "predict_proba"):
-        proba = model.predict_proba(X_test)[:, 1]
-        out["log_loss"] = log_loss(y_test, proba)
-        out["roc_auc"] = roc_auc_score(y_test, proba)
-
-    return out
+    return evaluate_model(model, X_test, y_test)
 
 def pretty_confusion_matrix(cm):
     """Return a nicely formatted confusion matrix as a rich table."""
@@ -151,6 +177,7 @@ def print_feature_importance(pipe, feature_names, top_n=None):
     """
     Display feature importances for tree-based models (Decision Tree, RF, XGB).
     Works with models inside sklearn Pipelines.
+    Set TENNIS_PLOT=1 to also show a bar chart.
     """
     clf = pipe.named_steps['clf']
 
@@ -158,24 +185,26 @@ def print_feature_importance(pipe, feature_names, top_n=None):
         print("⚠️ This model does not support feature importances.")
         return
 
-    importances = clf.feature_importances_
-    feat_imp = pd.DataFrame({
-        "feature": feature_names,
-        "importance": importances
-    }).sort_values(by="importance", ascending=False)
+    importances = np.asarray(clf.feature_importances_)
+    order = np.argsort(-importances, kind="stable")
 
     # If top_n is given, show only top_n features
     if top_n:
-        feat_imp = feat_imp.head(top_n)
+        order = order[:top_n]
 
+    names = [feature_names[i] for i in order]
+    width = max(len(name) for name in names)
     print("\n📊 Feature Importances:")
-    print(feat_imp)
-
-    # Optional visualization
-    plt.figure(figsize=(10, 6))
-    plt.barh(feat_imp['feature'], feat_imp['importance'])
-    plt.gca().invert_yaxis()
-    plt.title("Feature Importances")
-    plt.xlabel("Importance")
-    plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    for name, importance in zip(names, importances[order]):
+        print(f"  {name:<{width}}  {importance:.4f}")
+
+    # Optional visualization (matplotlib is only imported when asked for)
+    if os.environ.get("TENNIS_PLOT"):
+        import matplotlib.pyplot as plt
+        plt.figure(figsize=(10, 6))
+        plt.barh(names, importances[order])
+        plt.gca().invert_yaxis()
+        plt.title("Feature Importances")
+        plt.xlabel("Importance")
+        plt.tight_layout()
+        plt.show()
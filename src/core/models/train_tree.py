@@ -1,10 +1,9 @@
 from sklearn.tree import DecisionTreeClassifier
-from sklearn.pipeline import Pipeline
-from joblib import dump
 import numpy as np
 from .train_common import (
     load_data,
-    make_preprocessor,
+    make_pipeline,
+    save_model,
     split,
     evaluate,
     print_metrics,
@@ -12,6 +11,10 @@ from .train_common import (
     FEATURES
 )
 
+def make_classifier(n_jobs=None):
+    # Single-threaded estimator; n_jobs accepted for a uniform factory signature
+    return DecisionTreeClassifier(max_depth=8, random_state=42)
+
 def main():
     # 🧠 Load and split data with temporal weighting
     X, y, sample_weights = load_data("data/processed/matches_model_ready.csv")
@@ -26,10 +29,7 @@ def main():
     print()
 
     # 🌳 Build pipeline
-    pipe = Pipeline([
-        ("pre", make_preprocessor()),
-        ("clf", DecisionTreeClassifier(max_depth=8, random_state=42))
-    ])
+    pipe = make_pipeline(make_classifier())
 
     # 🚀 Train with sample weights (recent matches weighted more)
     pipe.fit(Xtr, ytr, clf__sample_weight=wtr)
@@ -44,7 +44,7 @@ def main():
     print_feature_importance(pipe, FEATURES, top_n=10)
 
     # 💾 Save model
-    dump(pipe, "models/tree_model.pkl")
+    save_model(pipe, "models/tree_model.pkl")
     print("✅ models/tree_model.pkl saved")
 
 if __name__ == "__main__":
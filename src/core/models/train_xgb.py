@@ -1,10 +1,9 @@
 from xgboost import XGBClassifier
-from sklearn.pipeline import Pipeline
-from joblib import dump
 import numpy as np
 from .train_common import (
     load_data,
-    make_preprocessor,
+    make_pipeline,
+    save_model,
     split,
     evaluate,
     print_metrics,
@@ -12,6 +11,19 @@ from .train_common import (
     FEATURES
 )
 
+def make_classifier(n_jobs=-1):
+    return XGBClassifier(
+        n_estimators=400,
+        learning_rate=0.05,
+        max_depth=6,
+        subsample=0.85,
+        colsample_bytree=0.85,
+        random_state=42,
+        n_jobs=n_jobs,
+        tree_method="hist",
+        eval_metric="logloss"
+    )
+
 def main():
     # 🧠 Load and split data with temporal weighting
     X, y, sample_weights = load_data("data/processed/matches_model_ready.csv")
@@ -26,20 +38,10 @@ def main():
     print()
 
     # 🚀 XGBoost model
-    clf = XGBClassifier(
-        n_estimators=400,
-        learning_rate=0.05,
-        max_depth=6,
-        subsample=0.85,
-        colsample_bytree=0.85,
-        random_state=42,
-        n_jobs=-1,
-        tree_method="hist",
-        eval_metric="logloss"
-    )
+    clf = make_classifier()
 
     # 🧱 Build pipeline
-    pipe = Pipeline([("pre", make_preprocessor()), ("clf", clf)])
+    pipe = make_pipeline(clf)
 
     # 🚀 Train with sample weights (recent matches weighted more)
     pipe.fit(Xtr, ytr, clf__sample_weight=wtr)
@@ -54,7 +56,7 @@ def main():
     print_feature_importance(pipe, FEATURES, top_n=10)
 
     # 💾 Save model
-    dump(pipe, "models/xgb_model.pkl")
+    save_model(pipe, "models/xgb_model.pkl")
     print("✅ models/xgb_model.pkl saved")
 
 if __name__ == "__main__":
@@ -6,6 +6,7 @@ from src.services.market_data_service import (
     start_market_data_service,
     stop_background_poller,
     get_cache_snapshot,
+    get_metrics,
     is_polling_active
 )
 from src.services.market_data_app import create_market_data_app
@@ -14,6 +15,7 @@ __all__ = [
     'start_market_data_service',
     'stop_background_poller',
     'get_cache_snapshot',
+    'get_metrics',
     'is_polling_active',
     'create_market_data_app'
 ]
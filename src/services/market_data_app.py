@@ -7,10 +7,11 @@ The service logic (cache, poller) is in market_data_service.py.
 
 import time
 import logging
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 
 from src.services.market_data_service import (
     get_cache_snapshot,
+    get_metrics,
     is_polling_active
 )
 
@@ -40,11 +41,19 @@ def create_market_data_app() -> Flask:
         Returns:
             JSON with cached market data
         """
-        # Read-only access (no lock needed for reading in Python due to GIL)
-        # But we use lock for safety in case of future changes
+        # Lock-free read of the published snapshot (never mutated once published)
         # NOTE: This is a READ-ONLY operation. We never call Kalshi here.
         cache_snapshot = get_cache_snapshot()
-        return jsonify(cache_snapshot)
+        # Each published snapshot has its own generated_at, so it doubles as the ETag:
+        # clients that already hold this snapshot get an empty 304
+        etag = repr(cache_snapshot.get("generated_at", 0))
+        if etag in request.if_none_match:
+            response = app.response_class(status=304)
+        else:
+            # Snapshots are read-only views; jsonify needs plain dicts (shallow, a few keys)
+            response = jsonify({**cache_snapshot, "markets": dict(cache_snapshot["markets"])})
+        response.set_etag(etag)
+        return response
     
     @app.route('/health', methods=['GET'])
     def health_check():
@@ -65,6 +74,16 @@ def create_market_data_app() -> Flask:
             "polling_active": is_polling_active()
         })
     
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """
+        Service metrics endpoint.
+        
+        Returns:
+            Snapshot read counts and recent poll / orderbook-fetch durations
+        """
+        return jsonify(get_metrics())
+    
     return app
 
 
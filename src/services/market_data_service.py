@@ -4,15 +4,21 @@ Market Data Service - Service module for Kalshi API caching
 This module provides:
 - In-memory cache for market data
 - Background polling thread for Kalshi API
-- Thread-safe cache access
+- Lock-free cache reads (snapshots are published by reference swap)
 
 The Flask app factory is in market_data_app.py
 """
 
 import time
+import heapq
+import itertools
 import threading
 import logging
-from typing import Dict, Any, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 
 from src.trading.kalshi_client import KalshiClient, Environment
 from config.settings import (
@@ -40,19 +46,193 @@ logger = logging.getLogger(__name__)
 #     }
 #   }
 # }
-_cache: Dict[str, Any] = {
+#
+# Invariant: a published cache is never mutated. The writer builds a complete new
+# snapshot and swaps the module reference in one assignment (atomic under the GIL),
+# so readers take the current reference without locking or copying. Snapshots
+# (and their "markets" dict) are read-only MappingProxyType views to enforce this.
+_cache: Mapping[str, Any] = MappingProxyType({
     "generated_at": 0,
-    "markets": {}
-}
+    "markets": MappingProxyType({})
+})
 
-# Thread-safe lock for cache updates (single writer / many readers)
-_cache_lock = threading.RLock()
+# Guards service start-up bookkeeping (_poller_started) only - not cache reads/writes
+_start_lock = threading.RLock()
 
 # Background polling control
 _polling_active = threading.Event()
+_stop_requested = threading.Event()  # Set on stop so the poller's wait returns immediately
 _polling_thread: Optional[threading.Thread] = None
 _poller_started = False  # Ensure poller starts exactly once
 
+# Concurrent orderbook requests per poll when the bulk orderbook endpoint is unavailable
+# (kept below the client's HTTP pool size). The client's rate limiter still spaces
+# request starts; the workers overlap round trips.
+ORDERBOOK_FETCH_WORKERS = 8
+
+# Incremental orderbook polling: a market's orderbook is only re-fetched when one of
+# these market fields changed since the last fetch, or the cached copy is older than
+# ORDERBOOK_MAX_AGE_SECONDS
+ORDERBOOK_VERSION_FIELDS = (
+    "yes_bid", "yes_ask", "no_bid", "no_ask", "last_price", "volume", "open_interest"
+)
+ORDERBOOK_MAX_AGE_SECONDS = 60.0
+
+# Adaptive poll interval: halved (down to MIN) when the markets changed since the
+# previous poll, doubled (up to MAX) when they did not
+POLL_INTERVAL_SECONDS = 12.0
+MIN_POLL_INTERVAL_SECONDS = 6.0
+MAX_POLL_INTERVAL_SECONDS = 60.0
+
+# Timing fields copied into match_times (event_ticker -> timing fields)
+TIMING_KEYS = (
+    "match_start_time", "start_time", "scheduled_time", "expected_start_time",
+    "expected_expiration_time", "expiration_time", "close_time", "event_close_time",
+)
+
+# Markets enriched with orderbooks per poll (highest volume / soonest start first)
+MAX_ENRICHED_MARKETS = 100
+
+# Observability: snapshot reads and the last METRICS_WINDOW poll / orderbook-fetch
+# durations (seconds), reported by get_metrics() for tuning the poller
+METRICS_WINDOW = 500
+_snapshot_reads = itertools.count(1)  # next() is atomic, so readers need no lock
+_snapshot_reads_total = 0
+_poll_seconds: deque = deque(maxlen=METRICS_WINDOW)
+_orderbook_fetch_seconds: deque = deque(maxlen=METRICS_WINDOW)
+_started_at = time.time()
+
+# Kalshi client shared by all polls (keeps the parsed key and pooled HTTP connections)
+_kalshi_client: Optional[KalshiClient] = None
+
+# ticker -> (version, fetched_at, orderbook); only touched by the fetching thread
+_orderbook_cache: Dict[str, Tuple[tuple, float, Dict[str, Any]]] = {}
+
+
+def _get_kalshi_client() -> KalshiClient:
+    """Return the shared Kalshi client, creating it on first use."""
+    global _kalshi_client
+    if _kalshi_client is None:
+        env = Environment.PROD if KALSHI_USE_PRODUCTION else Environment.DEMO
+        _kalshi_client = KalshiClient(
+            access_key=KALSHI_ACCESS_KEY,
+            private_key_path=KALSHI_PRIVATE_KEY_PATH,
+            environment=env,
+        )
+    return _kalshi_client
+
+
+def _fetch_orderbook(client: KalshiClient, ticker: str) -> Optional[Dict[str, Any]]:
+    """Fetch one market's orderbook, or None if the request fails."""
+    try:
+        return client.get_orderbook(ticker)
+    except Exception as e:
+        logger.debug("Could not fetch orderbook for %s: %s", ticker, e)
+        return None
+
+
+def _fetch_orderbooks(client: KalshiClient, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch orderbooks for tickers: one bulk request, then concurrent per-ticker
+    requests for any tickers the bulk response did not cover (all of them if
+    the bulk endpoint fails).
+    
+    Returns:
+        Dict of ticker -> orderbook (tickers that could not be fetched are left out)
+    """
+    if not tickers:
+        return {}
+    try:
+        books = client.get_orderbooks_bulk(tickers)
+    except Exception as e:
+        logger.debug("Bulk orderbook fetch failed (%s), fetching per ticker", e)
+        books = {}
+    missing = [t for t in tickers if t not in books]
+    if missing:
+        if books:
+            logger.debug("Bulk orderbook response missed %d/%d tickers, fetching per ticker",
+                         len(missing), len(tickers))
+        with ThreadPoolExecutor(max_workers=ORDERBOOK_FETCH_WORKERS) as executor:
+            fetched = executor.map(lambda t: _fetch_orderbook(client, t), missing)
+            books.update((t, book) for t, book in zip(missing, fetched) if book is not None)
+    return books
+
+
+def _start_timestamp(market: Dict[str, Any]) -> Optional[float]:
+    """Match start (or expected start) as a unix timestamp, or None if unknown."""
+    for field in ("match_start_time", "expected_start_time", "start_time"):
+        value = market.get(field)
+        if value:
+            try:
+                return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+            except ValueError:
+                continue
+    return None
+
+
+def _select_markets(markets: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """
+    Pick the limit most valuable markets to enrich: highest volume first, then
+    closest to match start. Selected markets keep their original order.
+    """
+    if len(markets) <= limit:
+        return markets
+    now = time.time()
+    
+    def priority(i):
+        market = markets[i]
+        start = _start_timestamp(market)
+        closeness = -abs(now - start) if start is not None else float("-inf")
+        return (market.get("volume") or 0, closeness)
+    
+    chosen = heapq.nlargest(limit, range(len(markets)), key=priority)
+    return [markets[i] for i in sorted(chosen)]
+
+
+def _market_version(market: Dict[str, Any]) -> tuple:
+    """Fields whose change means the market's orderbook moved."""
+    return tuple(market.get(f) for f in ORDERBOOK_VERSION_FIELDS)
+
+
+def _enrich_orderbooks(client: KalshiClient, markets: List[Dict[str, Any]]):
+    """
+    Set market["orderbook"] on every market with a ticker, re-fetching only
+    new, changed or expired orderbooks and reusing the rest from _orderbook_cache.
+    A failed fetch drops the ticker's cache entry, so the market gets {} rather
+    than an outdated book, and is retried next poll.
+    """
+    now = time.time()
+    with_ticker = [m for m in markets if m.get("ticker")]
+    versions = {m["ticker"]: _market_version(m) for m in with_ticker}
+    
+    stale = []
+    for ticker, version in versions.items():
+        cached = _orderbook_cache.get(ticker)
+        if cached is None or cached[0] != version or now - cached[1] > ORDERBOOK_MAX_AGE_SECONDS:
+            stale.append(ticker)
+    
+    fetch_started = time.perf_counter()
+    fetched = _fetch_orderbooks(client, stale)
+    if stale:
+        _orderbook_fetch_seconds.append(time.perf_counter() - fetch_started)
+    for ticker in stale:
+        book = fetched.get(ticker)
+        if book is not None:
+            _orderbook_cache[ticker] = (versions[ticker], now, book)
+        else:
+            _orderbook_cache.pop(ticker, None)
+    
+    # Evict markets that are no longer listed
+    for ticker in [t for t in _orderbook_cache if t not in versions]:
+        del _orderbook_cache[ticker]
+    
+    for market in with_ticker:
+        cached = _orderbook_cache.get(market["ticker"])
+        market["orderbook"] = cached[2] if cached else {}
+    
+    logger.info("Orderbooks: fetched %d/%d stale, reused %d",
+                len(fetched), len(stale), len(with_ticker) - len(stale))
+
 
 def fetch_markets_from_kalshi() -> Optional[Dict[str, Any]]:
     """
@@ -64,47 +244,34 @@ def fetch_markets_from_kalshi() -> Optional[Dict[str, Any]]:
     Returns:
         Kalshi markets response dict, or None on error
     """
-    print("FETCHING FROM KALSHI")  # Debug: Prove requests never call this
-    logger.info("FETCHING FROM KALSHI")  # Also log it
+    logger.info("FETCHING FROM KALSHI")  # Proves requests never call this
+    started = time.perf_counter()
     try:
-        # Initialize Kalshi client
-        env = Environment.PROD if KALSHI_USE_PRODUCTION else Environment.DEMO
-        client = KalshiClient(
-            access_key=KALSHI_ACCESS_KEY,
-            private_key_path=KALSHI_PRIVATE_KEY_PATH,
-            environment=env,
-        )
+        # Shared Kalshi client (created once, reused across polls)
+        client = _get_kalshi_client()
         
         # Fetch tennis markets from all known series
         tennis_series = ["KXATPMATCH", "KXWTAMATCH", "KXUNITEDCUPMATCH"]
         all_markets = []
         
-        for series in tennis_series:
-            try:
-                response = client.get_markets(
-                    series_ticker=series,
-                    status="open",
-                    limit=1000
-                )
-                markets = response.get("markets", [])
-                all_markets.extend(markets)
-                logger.info(f"Fetched {len(markets)} markets from {series}")
-            except Exception as e:
-                logger.warning(f"Error fetching {series}: {e}")
-                continue
-        
-        # Enrich markets with orderbook data (prices, volume)
-        enriched_markets = []
-        for market in all_markets[:100]:  # Limit to 100 for performance
-            ticker = market.get("ticker")
-            if ticker:
+        # Series are independent - list them concurrently, then merge in series order
+        with ThreadPoolExecutor(max_workers=len(tennis_series)) as executor:
+            futures = [
+                executor.submit(client.get_markets, series_ticker=series, status="open", limit=1000)
+                for series in tennis_series
+            ]
+            for series, future in zip(tennis_series, futures):
                 try:
-                    orderbook = client.get_orderbook(ticker)
-                    market["orderbook"] = orderbook
+                    markets = future.result().get("markets", [])
+                    all_markets.extend(markets)
+                    logger.info("Fetched %d markets from %s", len(markets), series)
                 except Exception as e:
-                    logger.debug(f"Could not fetch orderbook for {ticker}: {e}")
-                    market["orderbook"] = {}
-            enriched_markets.append(market)
+                    logger.warning("Error fetching %s: %s", series, e)
+                    continue
+        
+        # Enrich markets with orderbook data (prices, volume) - only changed ones are re-fetched
+        enriched_markets = _select_markets(all_markets, MAX_ENRICHED_MARKETS)
+        _enrich_orderbooks(client, enriched_markets)
         
         # Extract match timing information for lookup by event_ticker
         # This allows auto_trader.py to get match start times without calling Kalshi
@@ -118,21 +285,11 @@ def fetch_markets_from_kalshi() -> Optional[Dict[str, Any]]:
             if event_ticker in match_times:
                 continue
             
-            # Extract all timing fields (match already has these from Kalshi)
-            timing_info = {
-                "match_start_time": market.get("match_start_time"),
-                "start_time": market.get("start_time"),
-                "scheduled_time": market.get("scheduled_time"),
-                "expected_start_time": market.get("expected_start_time"),
-                "expected_expiration_time": market.get("expected_expiration_time"),
-                "expiration_time": market.get("expiration_time"),
-                "close_time": market.get("close_time"),
-                "event_close_time": market.get("event_close_time"),
-            }
-            
-            # Only add if we have at least one timing field
-            if any(timing_info.values()):
-                match_times[event_ticker] = timing_info
+            # Extract all timing fields (match already has these from Kalshi);
+            # the dict is only built for events with at least one timing field
+            values = [market.get(k) for k in TIMING_KEYS]
+            if any(values):
+                match_times[event_ticker] = dict(zip(TIMING_KEYS, values))
         
         return {
             "markets": enriched_markets,
@@ -142,18 +299,44 @@ def fetch_markets_from_kalshi() -> Optional[Dict[str, Any]]:
         }
         
     except Exception as e:
-        logger.error(f"Error fetching markets from Kalshi: {e}", exc_info=True)
+        logger.error("Error fetching markets from Kalshi: %s", e, exc_info=True)
         return None
+    finally:
+        _poll_seconds.append(time.perf_counter() - started)
+
+
+def _publish_cache(markets_data: Dict[str, Any]):
+    """
+    Publish a new cache snapshot.
+    
+    The snapshot is fully built before the single reference assignment, and
+    markets_data must not be modified afterwards (readers share it).
+    """
+    global _cache
+    _cache = MappingProxyType({
+        "generated_at": time.time(),
+        "markets": MappingProxyType(markets_data)
+    })
+
+
+def _markets_signature(markets_data: Dict[str, Any]) -> int:
+    """Hash of every market's ticker and orderbook version fields (detects change between polls)."""
+    return hash(frozenset(
+        (m.get("ticker"), _market_version(m)) for m in markets_data.get("markets", [])
+    ))
 
 
 def background_poller():
     """
-    Background thread that polls Kalshi API every 12 seconds.
+    Background thread that polls Kalshi API (every POLL_INTERVAL_SECONDS to start with,
+    adapting between MIN_ and MAX_POLL_INTERVAL_SECONDS to how often markets change).
     
     This is the ONLY thread that writes to the cache.
     All request handlers are readers only.
     """
     logger.info("Background poller started")
+    interval = POLL_INTERVAL_SECONDS
+    last_signature = None
     
     while _polling_active.is_set():
         try:
@@ -161,29 +344,27 @@ def background_poller():
             markets_data = fetch_markets_from_kalshi()
             
             if markets_data:
-                # Atomic cache replacement (thread-safe)
-                # Create new dict and replace entire cache reference
-                new_cache = {
-                    "generated_at": time.time(),
-                    "markets": markets_data
-                }
-                
-                with _cache_lock:
-                    global _cache
-                    _cache = new_cache  # Atomic replacement, not mutation
+                _publish_cache(markets_data)
                 
                 logger.info(
-                    f"Cache updated: {markets_data.get('total_count', 0)} total markets, "
-                    f"{markets_data.get('enriched_count', 0)} enriched"
+                    "Cache updated: %d total markets, %d enriched",
+                    markets_data.get('total_count', 0), markets_data.get('enriched_count', 0)
                 )
+                
+                signature = _markets_signature(markets_data)
+                if signature == last_signature:
+                    interval = min(interval * 2, MAX_POLL_INTERVAL_SECONDS)
+                else:
+                    interval = max(interval / 2, MIN_POLL_INTERVAL_SECONDS)
+                last_signature = signature
             else:
                 logger.warning("Failed to fetch markets, keeping existing cache")
                 
         except Exception as e:
-            logger.error(f"Error in background poller: {e}", exc_info=True)
+            logger.error("Error in background poller: %s", e, exc_info=True)
         
-        # Wait 12 seconds before next poll
-        _polling_active.wait(12.0)
+        # Wait before next poll (returns early when the poller is stopped)
+        _stop_requested.wait(interval)
 
 
 def start_market_data_service():
@@ -199,30 +380,26 @@ def start_market_data_service():
     """
     global _poller_started
     
-    if _poller_started:
-        logger.warning("Market Data Service already started")
-        return
-    
-    logger.info("Initializing Market Data Service...")
-    
-    # Do initial fetch synchronously (blocking)
-    logger.info("Performing initial market fetch...")
-    markets_data = fetch_markets_from_kalshi()
-    
-    if markets_data:
-        with _cache_lock:
-            global _cache
-            _cache = {
-                "generated_at": time.time(),
-                "markets": markets_data
-            }
-        logger.info("Initial cache populated")
-    else:
-        logger.warning("Initial fetch failed, starting with empty cache")
-    
-    # Start background polling (exactly once)
-    start_background_poller()
-    _poller_started = True
+    with _start_lock:
+        if _poller_started:
+            logger.warning("Market Data Service already started")
+            return
+        
+        logger.info("Initializing Market Data Service...")
+        
+        # Do initial fetch synchronously (blocking)
+        logger.info("Performing initial market fetch...")
+        markets_data = fetch_markets_from_kalshi()
+        
+        if markets_data:
+            _publish_cache(markets_data)
+            logger.info("Initial cache populated")
+        else:
+            logger.warning("Initial fetch failed, starting with empty cache")
+        
+        # Start background polling (exactly once)
+        start_background_poller()
+        _poller_started = True
     logger.info("Market Data Service ready")
 
 
@@ -234,6 +411,7 @@ def start_background_poller():
         logger.warning("Background poller already running")
         return
     
+    _stop_requested.clear()
     _polling_active.set()
     _polling_thread = threading.Thread(target=background_poller, daemon=True)
     _polling_thread.start()
@@ -244,18 +422,44 @@ def stop_background_poller():
     """Stop the background polling thread."""
     global _polling_active
     _polling_active.clear()
+    _stop_requested.set()
     logger.info("Background poller stopped")
 
 
-def get_cache_snapshot() -> Dict[str, Any]:
+def get_cache_snapshot() -> Mapping[str, Any]:
     """
-    Get a snapshot of the current cache (thread-safe read).
+    Get the current cache snapshot (lock-free read).
     
     Returns:
-        Copy of the current cache
+        Read-only view of the published cache (shared with other readers).
+        Callers that need to modify it must make their own copy.
+    """
+    global _snapshot_reads_total
+    _snapshot_reads_total = next(_snapshot_reads)
+    return _cache
+
+
+def _duration_summary(samples) -> Dict[str, Any]:
+    """Count, last, p50 and p99 (seconds) of recent duration samples."""
+    values = sorted(samples)
+    if not values:
+        return {"count": 0, "last": None, "p50": None, "p99": None}
+    pick = lambda q: round(values[min(len(values) - 1, int(q * len(values)))], 4)
+    return {"count": len(values), "last": round(samples[-1], 4), "p50": pick(0.50), "p99": pick(0.99)}
+
+
+def get_metrics() -> Dict[str, Any]:
+    """
+    Service metrics for tuning: snapshot reads (total and per second since start)
+    and recent poll / orderbook-fetch durations.
     """
-    with _cache_lock:
-        return _cache.copy()
+    uptime = max(time.time() - _started_at, 1e-9)
+    return {
+        "snapshot_reads": _snapshot_reads_total,
+        "snapshot_reads_per_second": round(_snapshot_reads_total / uptime, 3),
+        "poll_seconds": _duration_summary(list(_poll_seconds)),
+        "orderbook_fetch_seconds": _duration_summary(list(_orderbook_fetch_seconds)),
+    }
 
 
 def is_polling_active() -> bool:
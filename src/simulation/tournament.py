@@ -1,29 +1,48 @@
 
 import argparse, pandas as pd
+import numpy as np
 from joblib import load
+from src.core.data.ingest import PARQUET_AVAILABLE
 FEATURES = ["elo_diff","surface_elo_diff","age_diff","height_diff","recent_win_rate_diff",
             "is_clay","is_grass","is_hard","best_of_5","round_code","tourney_level_code"]
 
+def predict_matches_proba(model, X):
+    """P(p1 wins) for every row of the 2-D feature array X (FEATURES order) in one model call."""
+    if hasattr(model, "predict_proba"):
+        return model.predict_proba(X)[:, 1].astype(float)
+    return np.asarray(model.predict(X), dtype=float)
+
 def predict_match_proba(model, row):
-    X = row[FEATURES].to_frame().T
-    return float(model.predict_proba(X)[0,1]) if hasattr(model,"predict_proba") else float(model.predict(X)[0])
+    # Plain 1-row array - no per-call DataFrame construction / dtype inference
+    X = row[FEATURES].to_numpy(dtype=float).reshape(1, -1)
+    return float(predict_matches_proba(model, X)[0])
 
-def main(bracket_csv, model_path):
-    model = load(model_path)
-    bracket = pd.read_csv(bracket_csv)
-    winners = []
-    for _, row in bracket.iterrows():
-        p = predict_match_proba(model, row)
-        winner = row["p1_id"] if p >= 0.5 else row["p2_id"]
-        winners.append((winner, p))
-    out = pd.DataFrame(winners, columns=["winner_id","p1_win_prob"])
+def main(bracket_csv, model_path, fmt="csv"):
+    # Memory-map the model's arrays (tree node tables) - repeat runs read them from the page cache
+    model = load(model_path, mmap_mode="r")
+    # Only the model features and player IDs; features as float32 (what the tree models use)
+    bracket = pd.read_csv(bracket_csv, usecols=FEATURES + ["p1_id", "p2_id"],
+                          dtype={f: "float32" for f in FEATURES})
+    probs = predict_matches_proba(model, bracket[FEATURES].to_numpy(dtype=float))
+    winners = np.where(probs >= 0.5, bracket["p1_id"].to_numpy(), bracket["p2_id"].to_numpy())
+    out = pd.DataFrame({"winner_id": winners, "p1_win_prob": probs})
     print(out)
-    out.to_csv("reports/bracket_results.csv", index=False)
-    print("✅ Saved reports/bracket_results.csv")
+    if fmt == "parquet" and not PARQUET_AVAILABLE:
+        print("⚠️  pyarrow not installed - writing CSV instead of Parquet")
+        fmt = "csv"
+    if fmt == "parquet":
+        path = "reports/bracket_results.parquet"
+        out.to_parquet(path, engine="pyarrow", index=False)
+    else:
+        path = "reports/bracket_results.csv"
+        out.to_csv(path, index=False)
+    print(f"✅ Saved {path}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--bracket", required=True)
     parser.add_argument("--model", default="models/rf_model.pkl")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Output format for the bracket results")
     args = parser.parse_args()
-    main(args.bracket, args.model)
+    main(args.bracket, args.model, args.format)
@@ -0,0 +1,41 @@
+"""
+Numeric kernel for the scan's value / expected-value threshold selection.
+
+Value and EV themselves are computed per market by KalshiMarketAnalyzer; the
+thresholds are applied here over all analyzed markets at once so the loop can be
+JIT-compiled (falls back to plain Python when numba is not installed).
+"""
+
+import numpy as np
+from src.core._njit import njit
+
+# Minimum |model_prob - kalshi_prob| before a YES/NO side is recommended
+# (KalshiMarketAnalyzer imports this for its own side selection)
+TRADE_EDGE_THRESHOLD = 0.05
+
+
+@njit(cache=True)
+def select_tradable(trade_values, evs, tradable, min_value, min_ev):
+    """
+    Apply the scan's value / EV thresholds to the analyzer's per-market results.
+    
+    Args:
+        trade_values: float64 array of analysis trade values (0 where no side was picked)
+        evs: float64 array of analysis expected values
+        tradable: bool array of analysis tradable flags
+        min_value: Minimum trade value (edge)
+        min_ev: Minimum expected value
+        
+    Returns:
+        bool array, True where the market passes every check
+    """
+    n = trade_values.shape[0]
+    passing = np.zeros(n, dtype=np.bool_)
+    for i in range(n):
+        passing[i] = tradable[i] and trade_values[i] >= min_value and evs[i] >= min_ev
+    return passing
+
+
+def warm_up():
+    """Trigger JIT compilation once up front so the first scan doesn't pay for it."""
+    select_tradable(np.zeros(1), np.zeros(1), np.zeros(1, dtype=np.bool_), 0.0, 0.0)
@@ -4,10 +4,17 @@ Continuously scans for opportunities and places trades when value threshold is m
 """
 
 import time
+import atexit
+import queue
 import logging
 import json
+import sys
 import threading
-from typing import Dict, List, Optional, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, NamedTuple, Optional, Any
 from datetime import datetime, timedelta, timezone
 try:
     from zoneinfo import ZoneInfo  # Python 3.9+
@@ -22,50 +29,230 @@ except ImportError:
         except ImportError:
             # Last resort: manual EST offset (UTC-5, doesn't handle DST)
             ZoneInfo = None
+try:
+    from ciso8601 import parse_datetime as parse_iso_datetime  # Optional - C ISO-8601 parser
+except ImportError:
+    parse_iso_datetime = None
+from functools import lru_cache
 from pathlib import Path
 
+def _resolve_est_tz():
+    """US Eastern time zone (handles EST/EDT automatically), or None if it can't be built."""
+    if not ZoneInfo:
+        return None
+    try:
+        return ZoneInfo("America/New_York")
+    except Exception:
+        return None
+
+
+# Time zones used when parsing / displaying match times, built once at import
+# (Kalshi times are UTC; trading-window math is done in US Eastern)
+_UTC_TZ = timezone.utc
+_EST_TZ = _resolve_est_tz()  # None when no DST-aware zone is available
+# Zone for time math - last resort: manual EST offset (UTC-5, doesn't handle DST)
+_EST_CALC_TZ = _EST_TZ or timezone(timedelta(hours=-5))
+
+import requests
+from requests.adapters import HTTPAdapter
+
 from src.trading.kalshi_client import KalshiClient, Environment
 from src.trading.kalshi_analyzer import KalshiMarketAnalyzer
-from src.api.player_stats import PlayerStatsDB
-from src.api.predictor import MatchPredictor
+from src.api.player_stats import get_player_db
+from src.api.predictor import get_predictor
+
+
+# Display format used by format_time_est
+_EST_DISPLAY_FORMAT = " (%Y-%m-%d %I:%M %p EST)"
 
 
 def format_time_est(dt: datetime) -> str:
     """Convert UTC datetime to EST and format for display."""
-    if not dt:
+    # Without a DST-aware zone only the fixed UTC-5 fallback exists, so show nothing
+    if not dt or _EST_TZ is None:
         return ""
-    if ZoneInfo:
-        try:
-            est_tz = ZoneInfo("America/New_York")  # Handles EST/EDT automatically
-            # If naive, assume EST; if has timezone, convert to EST
-            if dt.tzinfo is None:
-                if hasattr(est_tz, 'localize'):
-                    est_dt = est_tz.localize(dt)
-                else:
-                    est_dt = dt.replace(tzinfo=est_tz)
-            else:
-                est_dt = dt.astimezone(est_tz)
-            return f" ({est_dt.strftime('%Y-%m-%d %I:%M %p EST')})"
-        except:
-            pass
-    return ""
+    # If naive, assume EST; if has timezone, convert to EST
+    if dt.tzinfo is None:
+        est_dt = _EST_TZ.localize(dt) if hasattr(_EST_TZ, 'localize') else dt.replace(tzinfo=_EST_TZ)
+    else:
+        est_dt = dt.astimezone(_EST_TZ)
+    return est_dt.strftime(_EST_DISPLAY_FORMAT)
 from config.settings import RAW_DATA_DIR, MODELS_DIR
 
 
-# Ensure logs directory exists before configuring logging
-Path("logs").mkdir(exist_ok=True)
+# Most recent live trades kept in memory (older ones remain in the log)
+TRADE_HISTORY_MAXLEN = 10_000
+
+# Concurrent orderbook fetches per trading batch (the client's rate limiter still
+# spaces request starts, so this mainly overlaps round trips)
+ORDERBOOK_PREFETCH_WORKERS = 4
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/auto_trader.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+# Background log writer, started by setup_logging()
+_log_listener: Optional[QueueListener] = None
+_log_setup_lock = threading.Lock()
+
+
+def setup_logging() -> None:
+    """
+    Configure logging for a trading run: logs/auto_trader.log plus the console.
+    
+    Records are formatted by the QueueHandler on the calling thread; the file / console
+    writes happen on the listener's background thread so trading code never blocks on I/O.
+    Called from the trading entry points (not at import); repeated calls are no-ops.
+    """
+    global _log_listener
+    with _log_setup_lock:
+        if _log_listener is not None:
+            return
+        # Ensure logs directory exists before configuring logging
+        Path("logs").mkdir(exist_ok=True)
+        log_queue = queue.SimpleQueue()
+        _log_listener = QueueListener(
+            log_queue,
+            logging.FileHandler('logs/auto_trader.log'),
+            logging.StreamHandler()
+        )
+        _log_listener.start()
+        atexit.register(_log_listener.stop)  # Flush queued records on exit
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            handlers=[QueueHandler(log_queue)]
+        )
+
+
+def _parse_kalshi_time(value: str) -> datetime:
+    """
+    Parse a Kalshi timestamp (ISO 8601, or 'YYYY-MM-DD HH:MM:SS') into US Eastern time.
+    Timestamps without a zone are taken as UTC (Kalshi default).
+    
+    Raises:
+        ValueError: If value is not a date with a time of day
+    """
+    if len(value) <= 10:
+        raise ValueError(f"Timestamp has no time of day: {value}")
+    if parse_iso_datetime is not None:
+        dt = parse_iso_datetime(value)
+    else:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=_UTC_TZ)
+    return dt.astimezone(_EST_CALC_TZ)
+
+
+@lru_cache(maxsize=4096)
+def _event_ticker_of(ticker: str) -> Optional[str]:
+    """
+    Memoized body of AutoTrader._extract_event_ticker (tickers repeat across scans).
+    Warnings for malformed tickers are therefore logged once per ticker.
+    """
+    # Split on last dash to remove suffix (YES/NO/THO indicator) - no list allocation
+    event_ticker, sep, _ = ticker.rpartition('-')
+    if not sep:
+        logger.warning(f"⚠️  Ticker has no dashes, cannot extract event_ticker: {ticker}")
+        return None
+    
+    # Validate: event_ticker should have at least 1 dash (SERIES-DATE-EVENT format)
+    # This ensures we're not accidentally using a partial ticker
+    if '-' not in event_ticker:
+        logger.warning(f"⚠️  Extracted event_ticker seems invalid (no dashes): {event_ticker} from {ticker}")
+        return None
+    
+    return event_ticker
+
+
+def _top_level_ask(orderbook: Dict[str, Any]) -> Optional[int]:
+    """Best ask from the orderbook's top-level asks list."""
+    asks = orderbook.get("asks")
+    return asks[0].get("price") if asks else None
+
+
+def _side_ask(side: str):
+    """Build an extractor for the best ask in the side-specific ("yes"/"no") asks list."""
+    def extract(orderbook: Dict[str, Any]) -> Optional[int]:
+        side_data = orderbook.get(side)
+        if not isinstance(side_data, dict):
+            return None
+        asks = side_data.get("asks")
+        return asks[0].get("price") if asks else None
+    return extract
+
+
+def _direct_ask(orderbook: Dict[str, Any]) -> Optional[int]:
+    """Ask price from the flat ask fields."""
+    return orderbook.get("ask") or orderbook.get("yes_ask") or orderbook.get("no_ask")
+
+
+# Ask-price lookups per trade side, tried in order; the first non-empty price wins
+_ASK_EXTRACTORS = {
+    "yes": (_top_level_ask, _side_ask("yes"), _direct_ask),
+    "no": (_top_level_ask, _side_ask("no"), _direct_ask),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class SideConfig:
+    """Everything place_trade needs that depends on the trade side."""
+    label: str  # For log messages
+    price_key: str  # Order field / kalshi_odds key holding this side's price
+    player_idx: int  # Index into matched_players of the player this side bets on
+    ask_extractors: tuple  # This side's _ASK_EXTRACTORS entry
+    
+    def bet_probability(self, model_prob: float) -> float:
+        """Model probability for the player this side bets on (model_prob is for the asked player)."""
+        return model_prob if self.player_idx == 0 else 1.0 - model_prob
+
+
+_SIDE_CONFIG = {
+    "yes": SideConfig("YES", "yes_price", 0, _ASK_EXTRACTORS["yes"]),
+    "no": SideConfig("NO", "no_price", 1, _ASK_EXTRACTORS["no"]),
+}
+
+
+class Opportunity(NamedTuple):
+    """The opportunity fields place_trade reads, unpacked once from the analyzer's dict."""
+    ticker: Optional[str]
+    trade_side: Optional[str]
+    trade_value: float  # Absolute edge (abs(value) when the analyzer didn't set it)
+    value: float
+    expected_value: float
+    kalshi_odds: Dict[str, Any]
+    title: str
+    matched_players: tuple
+    bet_on_player: Optional[str]
+    model_probability: float
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Opportunity":
+        """Build from an analyzer opportunity dict, applying the usual defaults."""
+        value = data.get("value", 0)
+        return cls(
+            ticker=data.get("ticker"),
+            trade_side=data.get("trade_side"),
+            trade_value=data.get("trade_value", 0) or abs(value),
+            value=value,
+            expected_value=data.get("expected_value", 0),
+            kalshi_odds=data.get("kalshi_odds") or {},
+            title=data.get("title", "Unknown"),
+            matched_players=data.get("matched_players", ("", "")),
+            bet_on_player=data.get("bet_on_player"),
+            model_probability=data.get("model_probability", 0),
+        )
+
+
+class TradeRecord(NamedTuple):
+    """One live trade, reduced to the fields reported by get_trade_summary."""
+    timestamp: str
+    ticker: str
+    side: str
+    count: int
+    price: int  # Cents
+    value_edge: float
+    expected_value: float
+    order_id: Optional[str]
+
 
 class AutoTrader:
     """
@@ -115,14 +302,32 @@ class AutoTrader:
         # Track trades to avoid duplicates
         # CRITICAL: Track by event_ticker (match), not ticker (YES/NO side)
         # This prevents placing trades on both YES and NO sides of the same match
-        self.traded_markets = set()  # Set of tickers we've already traded (for backward compatibility)
+        # (a traded ticker always has its event_ticker here, so no separate ticker set is kept)
         self.traded_events = set()  # Set of event_tickers (matches) we've already traded
-        self.trade_history = []  # List of all trades placed
+        self.trade_history = deque(maxlen=TRADE_HISTORY_MAXLEN)  # TradeRecords of recent trades placed
+        self.total_trades = 0  # All trades placed (trade_history is capped)
+        self.last_scan_opportunities = 0  # New tradable opportunities seen by the latest scan
         
         # Cache for match timing from Market Data Service (avoids repeated Kalshi calls)
         self._cached_match_times = {}  # event_ticker -> timing dict
+        self._match_times_ts = float("-inf")  # time.monotonic() of the last match_times refresh
+        
+        # Scan-scoped snapshot of open positions (refreshed once per scan, not per candidate)
+        self._positions_ticker_set = set()  # Tickers we hold positions in
+        self._positions_event_index = set()  # Event tickers (matches) we hold positions in
+        self._positions_snapshot_ts = float("-inf")  # time.monotonic() of the last refresh
+        
+        # Current EST time shared by a scan's timing checks (None outside a scan)
+        self._scan_now: Optional[datetime] = None
         self._market_data_service_url = "http://localhost:5002"
         
+        # Keep-alive session for Market Data Service requests (no handshake per call),
+        # plus the last /markets body and its ETag for conditional (304) requests
+        self._http = requests.Session()
+        self._http.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        self._markets_etag: Optional[str] = None
+        self._markets_cached: Optional[Dict[str, Any]] = None
+        
         # Persistence file path
         self._persistence_file = Path("data/traded_events.json")
         self._persistence_file.parent.mkdir(parents=True, exist_ok=True)
@@ -271,26 +476,21 @@ class AutoTrader:
         except Exception as e:
             logger.warning(f"⚠️  Error saving trade memory: {e}")
     
-    def calculate_position_size(self, opportunity: Dict[str, Any]) -> int:
+    def calculate_position_size(self, opportunity) -> int:
         """
         Calculate position size - ALWAYS returns 1 contract per trade.
         
         Args:
-            opportunity: Opportunity dictionary from analyzer
+            opportunity: Opportunity (or opportunity dictionary from analyzer)
             
         Returns:
             Always 1 contract (or 0 if below threshold)
         """
-        # Use trade_value which is always positive (abs of value)
+        if not isinstance(opportunity, Opportunity):
+            opportunity = Opportunity.from_dict(opportunity)
+        # Use trade_value which is always positive (abs of value, see Opportunity.from_dict)
         # This ensures we use the actual edge, not the signed value
-        trade_value = opportunity.get("trade_value", 0)
-        if trade_value == 0:
-            # Fallback to abs(value) if trade_value not set
-            value = opportunity.get("value", 0)
-            trade_value = abs(value)
-        
-        # Check if above threshold
-        if trade_value < self.min_value_threshold:
+        if opportunity.trade_value < self.min_value_threshold:
             return 0
         
         # ALWAYS return 1 contract per trade (user requirement)
@@ -311,27 +511,30 @@ class AutoTrader:
         """
         if not ticker or not isinstance(ticker, str):
             return None
+        return _event_ticker_of(ticker)
+    
+    def _fetch_markets_from_service(self) -> Optional[Dict[str, Any]]:
+        """
+        GET /markets from the Market Data Service over the pooled session.
         
-        # Must have at least one dash to have a suffix
-        if '-' not in ticker:
-            logger.warning(f"⚠️  Ticker has no dashes, cannot extract event_ticker: {ticker}")
-            return None
-        
-        # Split on last dash to remove suffix (YES/NO/THO indicator)
-        parts = ticker.rsplit('-', 1)
-        if len(parts) != 2:
-            logger.warning(f"⚠️  Ticker format unexpected, cannot extract event_ticker: {ticker}")
-            return None
-        
-        event_ticker = parts[0]  # Everything before last dash
+        Sends the last ETag so an unchanged snapshot comes back as an empty 304
+        and the previously parsed body is reused.
         
-        # Validate: event_ticker should have at least 1 dash (SERIES-DATE-EVENT format)
-        # This ensures we're not accidentally using a partial ticker
-        if event_ticker.count('-') < 1:
-            logger.warning(f"⚠️  Extracted event_ticker seems invalid (no dashes): {event_ticker} from {ticker}")
-            return None
-        
-        return event_ticker
+        Returns:
+            Market data snapshot dict, or None if the service returned an error status
+        """
+        headers = {}
+        if self._markets_etag and self._markets_cached is not None:
+            headers["If-None-Match"] = self._markets_etag
+        response = self._http.get(f"{self._market_data_service_url}/markets", headers=headers, timeout=2)
+        if response.status_code == 304:
+            return self._markets_cached
+        if response.status_code == 200:
+            self._markets_cached = response.json()
+            self._markets_etag = response.headers.get("ETag")
+            return self._markets_cached
+        logger.warning(f"Market data service returned status {response.status_code}")
+        return None
     
     def _get_match_timing_from_service(self, event_ticker: str) -> Optional[Dict[str, Any]]:
         """
@@ -346,30 +549,32 @@ class AutoTrader:
         Returns:
             Dict with timing fields, or None if not found
         """
-        # First check our local cache (from last service fetch)
+        # First check our local cache (refreshed once per scan)
         if event_ticker in self._cached_match_times:
             return self._cached_match_times[event_ticker]
         
-        # If not in cache, fetch from service
+        # A miss on a fresh cache means the service has no timing for this event -
+        # only re-fetch once the cache is older than a scan interval
+        if time.monotonic() - self._match_times_ts <= self.scan_interval:
+            return None
+        self._refresh_match_times_cache()
+        return self._cached_match_times.get(event_ticker)
+    
+    def _refresh_match_times_cache(self) -> None:
+        """Reload the event_ticker -> timing map from one Market Data Service fetch."""
         try:
-            import requests
-            response = requests.get(f"{self._market_data_service_url}/markets", timeout=2)
-            if response.status_code == 200:
-                markets_data = response.json()
+            markets_data = self._fetch_markets_from_service()
+            if markets_data is not None:
                 markets_dict = markets_data.get("markets", {})
-                match_times = markets_dict.get("match_times", {})
-                
-                # Update local cache
-                self._cached_match_times = match_times
-                
-                # Return timing for this event
-                return match_times.get(event_ticker)
-            else:
-                logger.warning(f"Market data service returned status {response.status_code}")
-                return None
+                if isinstance(markets_dict, dict):
+                    self._set_match_times(markets_dict.get("match_times", {}))
         except Exception as e:
             logger.error(f"Error fetching match timing from service: {e}")
-            return None
+    
+    def _set_match_times(self, match_times: Dict[str, Any]) -> None:
+        """Replace the cached match timing map and mark it fresh."""
+        self._cached_match_times = match_times
+        self._match_times_ts = time.monotonic()
     
     def check_existing_position(self, ticker: str) -> bool:
         """
@@ -382,44 +587,77 @@ class AutoTrader:
             True if we already have a position in this market or any market for the same event
         """
         try:
-            positions = self.get_current_positions()
-            positions_list = positions.get("positions", [])
+            # Positions come from the scan's snapshot; refetch only if it is older than a scan
+            if time.monotonic() - self._positions_snapshot_ts > self.scan_interval:
+                self._refresh_positions()
             
-            # Extract event_ticker for this ticker
+            if ticker in self._positions_ticker_set:
+                return True
+            # Also check if position is in the same event (match)
             event_ticker = self._extract_event_ticker(ticker)
-            
-            for pos in positions_list:
-                pos_ticker = pos.get("ticker")
-                if pos_ticker == ticker:
-                    return True
-                # Also check if position is in the same event (match)
-                if event_ticker:
-                    pos_event_ticker = self._extract_event_ticker(pos_ticker)
-                    if pos_event_ticker == event_ticker:
-                        return True
-            return False
+            return bool(event_ticker) and event_ticker in self._positions_event_index
         except Exception as e:
             logger.warning(f"Error checking positions for {ticker}: {e}")
             return False
     
-    def place_trade(self, opportunity: Dict[str, Any], min_minutes_before: int = 15) -> Optional[Dict[str, Any]]:
+    def _refresh_positions(self) -> None:
+        """Fetch open positions once and index them by ticker and event ticker."""
+        positions = self.get_current_positions()
+        tickers = set()
+        events = set()
+        for pos in positions.get("positions", []):
+            pos_ticker = pos.get("ticker")
+            if not pos_ticker:
+                continue
+            tickers.add(pos_ticker)
+            pos_event_ticker = self._extract_event_ticker(pos_ticker)
+            if pos_event_ticker:
+                events.add(pos_event_ticker)
+        self._positions_ticker_set = tickers
+        self._positions_event_index = events
+        self._positions_snapshot_ts = time.monotonic()
+    
+    def place_trade(
+        self,
+        opportunity,
+        min_minutes_before: int = 15,
+        orderbook: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
         """
         Place a trade for an opportunity.
         
         Args:
-            opportunity: Opportunity dictionary from analyzer
+            opportunity: Opportunity dictionary from analyzer (or an Opportunity)
             min_minutes_before: Minimum minutes before match start (default 15)
+            orderbook: Orderbook already fetched for this ticker (fetched here if None)
             
         Returns:
             Order response from Kalshi or None if failed
         """
-        ticker = opportunity.get("ticker")
-        trade_side = opportunity.get("trade_side")
-        kalshi_odds = opportunity.get("kalshi_odds", {})
+        # Unpack the dict once; fields are plain attribute reads from here on
+        if not isinstance(opportunity, Opportunity):
+            opportunity = Opportunity.from_dict(opportunity)
+        ticker = opportunity.ticker
+        trade_side = opportunity.trade_side
+        kalshi_odds = opportunity.kalshi_odds
         
         if not ticker or not trade_side:
             logger.error(f"Invalid opportunity: missing ticker or trade_side")
             return None
+        side = _SIDE_CONFIG.get(trade_side)
+        if side is None:
+            logger.error(f"Invalid trade_side: {trade_side}")
+            return None
+        
+        # Calculate position size (and check EV) first, so sub-threshold opportunities
+        # never reach the position / match-time / orderbook requests below
+        position_size = self.calculate_position_size(opportunity)
+        if position_size == 0:
+            logger.warning(f"Skipping {ticker}: position size calculated as 0")
+            return None
+        if opportunity.expected_value < self.min_ev_threshold:
+            logger.info(f"Skipping {ticker}: expected value below {self.min_ev_threshold:.2%}")
+            return None
         
         # CRITICAL: Extract event_ticker to prevent trading both YES and NO sides of same match
         event_ticker = self._extract_event_ticker(ticker)
@@ -428,12 +666,8 @@ class AutoTrader:
             logger.error(f"   This prevents accidentally trading the same match multiple times")
             return None
         
-        # Check if we already traded this specific ticker
-        if ticker in self.traded_markets:
-            logger.info(f"Skipping {ticker}: already traded this ticker")
-            return None
-        
         # CRITICAL: Check if we already traded this event (match) - prevents YES/NO duplicates
+        # (also covers re-trading the same ticker)
         if event_ticker in self.traded_events:
             logger.warning(f"🚫 BLOCKED: Skipping {ticker}: already traded event {event_ticker} (preventing duplicate trade on same match)")
             return None
@@ -451,13 +685,7 @@ class AutoTrader:
         # - No maximum time limit (can trade anytime before match start)
         try:
             # Get match timing from Market Data Service (NO Kalshi call)
-            # Extract event_ticker from market ticker (format: SERIES-DATE-EVENT-SUFFIX)
-            # e.g., KXATPMATCH-26JAN03NAVTHO-THO -> KXATPMATCH-26JAN03NAVTHO
-            event_ticker = self._extract_event_ticker(ticker)
-            if not event_ticker:
-                logger.warning(f"Cannot extract event_ticker from {ticker}, skipping timing check")
-                return None
-            
+            # (event_ticker was extracted and validated at the top of place_trade)
             # Get timing from service cache (replaces direct Kalshi call)
             timing_info = self._get_match_timing_from_service(event_ticker)
             if not timing_info:
@@ -494,57 +722,25 @@ class AutoTrader:
                     logger.error(f"     Available fields: match_start_time={timing_info.get('match_start_time')}, start_time={timing_info.get('start_time')}, scheduled_time={timing_info.get('scheduled_time')}, expected_start_time={timing_info.get('expected_start_time')}")
                     return None
                 
-                # DEBUG: Log all time fields from service cache
-                logger.info(f"🔍 DEBUG TIME PARSING for {ticker}:")
-                logger.info(f"  Time field used: {time_field_used} = {close_time}")
-                logger.info(f"  All available time fields from service:")
-                logger.info(f"    match_start_time: {timing_info.get('match_start_time')}")
-                logger.info(f"    start_time: {timing_info.get('start_time')}")
-                logger.info(f"    scheduled_time: {timing_info.get('scheduled_time')}")
-                logger.info(f"    expected_start_time: {timing_info.get('expected_start_time')}")
-                logger.info(f"    expected_expiration_time: {timing_info.get('expected_expiration_time')}")
-                logger.info(f"    expiration_time: {timing_info.get('expiration_time')}")
-                logger.info(f"    close_time: {timing_info.get('close_time')}")
-                logger.info(f"    event_close_time: {timing_info.get('event_close_time')}")
+                # DEBUG: Log all time fields from service cache (only built when DEBUG is on)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"🔍 DEBUG TIME PARSING for {ticker}:")
+                    logger.debug(f"  Time field used: {time_field_used} = {close_time}")
+                    logger.debug(f"  All available time fields from service:")
+                    for field in ("match_start_time", "start_time", "scheduled_time", "expected_start_time",
+                                  "expected_expiration_time", "expiration_time", "close_time", "event_close_time"):
+                        logger.debug(f"    {field}: {timing_info.get(field)}")
                 
                 if close_time:
                     # CRITICAL: Kalshi API returns times in UTC (with 'Z' suffix)
                     # We MUST parse as UTC first, then convert to EST for all calculations
                     # This ensures times match what Kalshi shows on their website
-                    if ZoneInfo:
-                        est_tz = ZoneInfo("America/New_York")
-                        utc_tz = timezone.utc
-                    else:
-                        est_tz = timezone(timedelta(hours=-5))
-                        utc_tz = timezone.utc
+                    est_tz = _EST_CALC_TZ
                     
                     if isinstance(close_time, str):
-                        if 'T' in close_time:
-                            # ISO format - check for timezone marker
-                            if close_time.endswith('Z'):
-                                # Explicitly UTC - parse as UTC, then convert to EST
-                                dt_utc = datetime.fromisoformat(close_time.replace('Z', '+00:00'))
-                                close_dt = dt_utc.astimezone(est_tz)
-                                logger.info(f"  ✅ Parsed UTC with Z: {dt_utc} -> EST: {close_dt}")
-                            elif '+' in close_time or (close_time.count('-') > 2 and 'T' in close_time):
-                                # Has timezone offset - parse as-is, then convert to EST
-                                dt_parsed = datetime.fromisoformat(close_time)
-                                close_dt = dt_parsed.astimezone(est_tz)
-                                logger.info(f"  ✅ Parsed with offset: {dt_parsed} -> EST: {close_dt}")
-                            else:
-                                # No timezone marker - assume UTC (Kalshi default), then convert to EST
-                                date_part = close_time.split('T')[0]
-                                time_part = close_time.split('T')[1].split('+')[0].split('-')[0].split('Z')[0]
-                                naive_dt = datetime.strptime(f"{date_part} {time_part}", "%Y-%m-%d %H:%M:%S")
-                                dt_utc = naive_dt.replace(tzinfo=utc_tz)
-                                close_dt = dt_utc.astimezone(est_tz)
-                                logger.info(f"  ✅ Parsed as UTC (no marker): {dt_utc} -> EST: {close_dt}")
-                        else:
-                            # Non-ISO format - assume UTC, then convert to EST
-                            naive_dt = datetime.strptime(close_time, "%Y-%m-%d %H:%M:%S")
-                            dt_utc = naive_dt.replace(tzinfo=utc_tz)
-                            close_dt = dt_utc.astimezone(est_tz)
-                            logger.info(f"  ✅ Parsed non-ISO as UTC: {dt_utc} -> EST: {close_dt}")
+                        close_dt = _parse_kalshi_time(close_time)
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(f"  ✅ Parsed {close_time} -> EST: {close_dt}")
                     
                     # If we're using an expiration time, estimate match start by subtracting 2.5 hours
                     # Tennis matches typically last 2-3 hours, so match start ≈ expiration - 2.5 hours
@@ -558,7 +754,7 @@ class AutoTrader:
                     
                     if close_dt:
                         # Work entirely in EST for calculations
-                        now = datetime.now(est_tz)
+                        now = self._scan_now or datetime.now(est_tz)
                         time_diff_minutes = (close_dt - now).total_seconds() / 60
                         logger.info(f"  ⏰ Current EST time: {now}")
                         logger.info(f"  ⏰ Match EST time: {close_dt}")
@@ -578,48 +774,28 @@ class AutoTrader:
         except Exception as e:
             logger.warning(f"Could not check match start time for {ticker}: {e}. Proceeding with caution.")
         
-        # Calculate position size
-        position_size = self.calculate_position_size(opportunity)
-        if position_size == 0:
-            logger.warning(f"Skipping {ticker}: position size calculated as 0")
-            return None
-        
         # Get current price from orderbook (use ask for buying - we need to buy at the ask price)
         try:
-            orderbook = self.client.get_orderbook(ticker)
+            if orderbook is None:
+                orderbook = self.client.get_orderbook(ticker)
             
             # For buying, we need to look at asks (sellers), not bids
-            # The ask price is what sellers are offering at
-            asks = orderbook.get("asks", [])
-            
-            # Fallback: try side-specific ask fields
-            if not asks:
-                if trade_side == "yes":
-                    yes_data = orderbook.get("yes", {})
-                    asks = yes_data.get("asks", []) if isinstance(yes_data, dict) else []
-                elif trade_side == "no":
-                    no_data = orderbook.get("no", {})
-                    asks = no_data.get("asks", []) if isinstance(no_data, dict) else []
-            
-            # Fallback: try direct ask fields
-            if not asks:
-                ask_price = orderbook.get("ask") or orderbook.get("yes_ask") or orderbook.get("no_ask")
-                if ask_price:
-                    best_ask_price = int(ask_price)
+            # The ask price is what sellers are offering at: top-level asks, then
+            # side-specific asks, then the direct ask fields
+            for extract_ask in side.ask_extractors:
+                best_ask_price = extract_ask(orderbook)
+                if best_ask_price:
+                    best_ask_price = int(best_ask_price)
+                    break
+            else:
+                # Last resort: use price from opportunity data
+                side_price = kalshi_odds.get(side.price_key, 0)
+                if side_price:
+                    best_ask_price = int(side_price)
                 else:
-                    # Last resort: use price from opportunity data
                     yes_price = kalshi_odds.get("yes_price", 0)
-                    no_price = kalshi_odds.get("no_price", 0)
-                    if trade_side == "yes" and yes_price:
-                        best_ask_price = int(yes_price)
-                    elif trade_side == "no" and no_price:
-                        best_ask_price = int(no_price)
-                    else:
-                        logger.warning(f"Using YES price from opportunity data: {yes_price} (orderbook had no asks)")
-                        best_ask_price = int(yes_price) if yes_price else None
-            else:
-                # Use best ask price (lowest price someone is willing to sell at)
-                best_ask_price = asks[0].get("price")
+                    logger.warning(f"Using YES price from opportunity data: {yes_price} (orderbook had no asks)")
+                    best_ask_price = int(yes_price) if yes_price else None
             
             if not best_ask_price:
                 logger.warning(f"No ask price available for {ticker}")
@@ -634,69 +810,43 @@ class AutoTrader:
         except Exception as e:
             logger.error(f"Error getting orderbook for {ticker}: {e}")
             # Fallback to opportunity data
-            yes_price = kalshi_odds.get("yes_price", 0)
-            no_price = kalshi_odds.get("no_price", 0)
-            if trade_side == "yes" and yes_price:
-                best_ask_price = int(yes_price)
-                logger.info(f"Using YES price from opportunity data: {best_ask_price} (orderbook error)")
-            elif trade_side == "no" and no_price:
-                best_ask_price = int(no_price)
-                logger.info(f"Using NO price from opportunity data: {best_ask_price} (orderbook error)")
+            side_price = kalshi_odds.get(side.price_key, 0)
+            if side_price:
+                best_ask_price = int(side_price)
+                logger.info(f"Using {side.label} price from opportunity data: {best_ask_price} (orderbook error)")
             else:
                 logger.error(f"Cannot determine price for {ticker}: {e}")
                 return None
         
-        # Place order - use yes_price or no_price based on trade_side
-        if trade_side == "yes":
-            order_data = {
-                "ticker": ticker,
-                "side": trade_side,
-                "action": "buy",
-                "count": position_size,
-                "yes_price": best_ask_price,  # Kalshi requires yes_price for YES orders
-            }
-        elif trade_side == "no":
-            order_data = {
-                "ticker": ticker,
-                "side": trade_side,
-                "action": "buy",
-                "count": position_size,
-                "no_price": best_ask_price,  # Kalshi requires no_price for NO orders
-            }
-        else:
-            logger.error(f"Invalid trade_side: {trade_side}")
-            return None
+        # Place order - Kalshi requires yes_price for YES orders and no_price for NO orders
+        order_data = {
+            "ticker": ticker,
+            "side": trade_side,
+            "action": "buy",
+            "count": position_size,
+            side.price_key: best_ask_price,
+        }
+        
+        # Player info for display
+        players = opportunity.matched_players
+        bet_on_player = opportunity.bet_on_player
+        if not bet_on_player:
+            bet_on_player = players[side.player_idx] if players[side.player_idx] else "Unknown"
+        
+        # Get model probability for the player we're betting on
+        model_prob_bet = side.bet_probability(opportunity.model_probability)
         
         # Check dry_run mode
         if self.dry_run:
             logger.info(f"🧪 DRY RUN MODE: Would place order: {order_data}")
-            logger.info(f"  Opportunity: {opportunity.get('title', 'Unknown')}")
-            logger.info(f"  Value edge: {opportunity.get('trade_value', opportunity.get('value', 0)):.2%}")
-            logger.info(f"  Expected value: {opportunity.get('expected_value', 0):.2%}")
+            logger.info(f"  Opportunity: {opportunity.title}")
+            logger.info(f"  Value edge: {opportunity.trade_value:.2%}")
+            logger.info(f"  Expected value: {opportunity.expected_value:.2%}")
             logger.info(f"  ⚠️  DRY RUN: Order NOT placed (simulation only - no real money)")
             # Return a simulated response for dry run
-            # Include opportunity data for display
-            players = opportunity.get('matched_players', ('', ''))
-            bet_on_player = opportunity.get('bet_on_player')
-            if not bet_on_player:
-                if trade_side == 'yes':
-                    bet_on_player = players[0] if players[0] else "Unknown"
-                else:
-                    bet_on_player = players[1] if players[1] else "Unknown"
-            
-            # Get model probability for the player we're betting on
-            model_prob = opportunity.get('model_probability', 0)
-            # If betting NO, model prob is for the asked player, so prob for bet_on_player is 1 - model_prob
-            if trade_side == 'no':
-                model_prob_bet = 1.0 - model_prob
-            else:
-                model_prob_bet = model_prob
-            
-            # Mark both ticker and event as traded even in dry run (prevents duplicates)
-            self.traded_markets.add(ticker)
-            event_ticker = self._extract_event_ticker(ticker)
+            # Mark event as traded even in dry run (prevents duplicates)
             if event_ticker:
-                self.traded_events.add(event_ticker)
+                self.traded_events.add(sys.intern(event_ticker))
                 self._save_trade_memory()  # Persist immediately
                 logger.info(f"✅ Marked event {event_ticker} as traded (DRY RUN - prevents duplicate trades on same match)")
             
@@ -720,45 +870,34 @@ class AutoTrader:
         try:
             logger.info(f"🔴 LIVE TRADING MODE: Placing REAL order on Kalshi: {order_data}")
             logger.info(f"  ⚠️  WARNING: This will place a REAL trade with REAL money!")
-            logger.info(f"  Opportunity: {opportunity.get('title', 'Unknown')}")
-            logger.info(f"  Value edge: {opportunity.get('trade_value', opportunity.get('value', 0)):.2%}")
-            logger.info(f"  Expected value: {opportunity.get('expected_value', 0):.2%}")
+            logger.info(f"  Opportunity: {opportunity.title}")
+            logger.info(f"  Value edge: {opportunity.trade_value:.2%}")
+            logger.info(f"  Expected value: {opportunity.expected_value:.2%}")
             
             order_response = self.client.place_order(**order_data)
             
             logger.info(f"✅ ORDER PLACED SUCCESSFULLY: {order_response}")
-            # Mark both ticker and event as traded to prevent duplicates
-            self.traded_markets.add(ticker)
-            event_ticker = self._extract_event_ticker(ticker)
+            # Keep the scan's positions snapshot current with the order just placed
+            self._positions_ticker_set.add(ticker)
             if event_ticker:
-                self.traded_events.add(event_ticker)
+                # Mark event as traded to prevent duplicates
+                self._positions_event_index.add(event_ticker)
+                self.traded_events.add(sys.intern(event_ticker))
                 self._save_trade_memory()  # Persist immediately
                 logger.info(f"✅ Marked event {event_ticker} as traded (prevents duplicate trades on same match)")
             
-            # Extract player info for display
-            players = opportunity.get('matched_players', ('', ''))
-            bet_on_player = opportunity.get('bet_on_player')
-            if not bet_on_player:
-                if trade_side == 'yes':
-                    bet_on_player = players[0] if players[0] else "Unknown"
-                else:
-                    bet_on_player = players[1] if players[1] else "Unknown"
-            
-            # Get model probability for the player we're betting on
-            model_prob = opportunity.get('model_probability', 0)
-            # If betting NO, model prob is for the asked player, so prob for bet_on_player is 1 - model_prob
-            if trade_side == 'no':
-                model_prob_bet = 1.0 - model_prob
-            else:
-                model_prob_bet = model_prob
-            
-            self.trade_history.append({
-                "timestamp": datetime.now().isoformat(),
-                "ticker": ticker,
-                "opportunity": opportunity,
-                "order": order_response,
-                "dry_run": False,
-            })
+            order_info = order_response.get("order", {}) if isinstance(order_response, dict) else {}
+            self.trade_history.append(TradeRecord(
+                timestamp=datetime.now().isoformat(),
+                ticker=ticker,
+                side=trade_side,
+                count=position_size,
+                price=best_ask_price,
+                value_edge=opportunity.trade_value,
+                expected_value=opportunity.expected_value,
+                order_id=order_info.get("order_id"),
+            ))
+            self.total_trades += 1
             
             # Return trade result with ticker and player info for logging
             return {
@@ -775,6 +914,38 @@ class AutoTrader:
             logger.error(traceback.format_exc())
             return None
     
+    def _prefetch_orderbooks(self, opportunities: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch orderbooks for the opportunities that meet the trade thresholds, concurrently.
+        
+        Args:
+            opportunities: Opportunities about to be passed to place_trade
+            
+        Returns:
+            Dict of ticker -> orderbook; failed fetches are left out so place_trade
+            fetches them again itself
+        """
+        tickers = []
+        for opp in opportunities:
+            ticker = opp.get("ticker")
+            trade_value = opp.get("trade_value", abs(opp.get("value", 0)))
+            if (ticker and trade_value >= self.min_value_threshold
+                    and opp.get("expected_value", 0) >= self.min_ev_threshold):
+                tickers.append(ticker)
+        if not tickers:
+            return {}
+        
+        def fetch(ticker):
+            try:
+                return self.client.get_orderbook(ticker)
+            except Exception as e:
+                logger.debug(f"Orderbook prefetch failed for {ticker}: {e}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=min(ORDERBOOK_PREFETCH_WORKERS, len(tickers))) as executor:
+            fetched = executor.map(fetch, tickers)
+            return {t: book for t, book in zip(tickers, fetched) if book is not None}
+    
     def scan_and_trade(self) -> List[Dict[str, Any]]:
         """
         Scan markets for opportunities and place trades.
@@ -787,26 +958,28 @@ class AutoTrader:
         logger.info(f"{'=' * 70}")
         
         try:
+            # One clock read for the scan's timing filter (refreshed per trading batch)
+            self._scan_now = datetime.now(_EST_CALC_TZ)
+            
+            # One positions fetch per scan; check_existing_position reads this snapshot
+            self._refresh_positions()
+            
             # Fetch markets from Market Data Service (ONLY place that calls Kalshi)
             # This ensures run.py never calls Kalshi directly
             markets = []
             try:
-                import requests
-                response = requests.get(f"{self._market_data_service_url}/markets", timeout=2)
-                if response.status_code == 200:
-                    markets_data = response.json()
+                markets_data = self._fetch_markets_from_service()
+                if markets_data is not None:
                     markets_dict = markets_data.get("markets", {})
                     if isinstance(markets_dict, dict):
                         markets = markets_dict.get("markets", [])
-                        # Cache match_times for later use (avoids repeated service calls)
-                        match_times = markets_dict.get("match_times", {})
-                        self._cached_match_times = match_times
+                        # Cache match_times for this scan's timing lookups (no per-trade service calls)
+                        self._set_match_times(markets_dict.get("match_times", {}))
                     elif isinstance(markets_dict, list):
                         markets = markets_dict
                     else:
                         markets = []
                 else:
-                    logger.warning(f"Market data service returned status {response.status_code}")
                     markets = []
             except Exception as e:
                 logger.error(f"Market data service unavailable: {e}")
@@ -871,6 +1044,7 @@ class AutoTrader:
                 filtered_tradable.append(opp)
             
             tradable = filtered_tradable
+            self.last_scan_opportunities = len(tradable)
             
             if skipped_traded > 0:
                 logger.info(f"   🔒 Filtered out {skipped_traded} opportunities (already traded/held events)")
@@ -958,36 +1132,10 @@ class AutoTrader:
                             if close_time:
                                 # CRITICAL: Kalshi API returns times in UTC (with 'Z' suffix)
                                 # We MUST parse as UTC first, then convert to EST for all calculations
-                                if ZoneInfo:
-                                    est_tz = ZoneInfo("America/New_York")
-                                    utc_tz = timezone.utc
-                                else:
-                                    est_tz = timezone(timedelta(hours=-5))
-                                    utc_tz = timezone.utc
+                                est_tz = _EST_CALC_TZ
                                 
                                 if isinstance(close_time, str):
-                                    if 'T' in close_time:
-                                        # ISO format - check for timezone marker
-                                        if close_time.endswith('Z'):
-                                            # Explicitly UTC - parse as UTC, then convert to EST
-                                            dt_utc = datetime.fromisoformat(close_time.replace('Z', '+00:00'))
-                                            close_dt = dt_utc.astimezone(est_tz)
-                                        elif '+' in close_time or (close_time.count('-') > 2 and 'T' in close_time):
-                                            # Has timezone offset - parse as-is, then convert to EST
-                                            dt_parsed = datetime.fromisoformat(close_time)
-                                            close_dt = dt_parsed.astimezone(est_tz)
-                                        else:
-                                            # No timezone marker - assume UTC (Kalshi default), then convert to EST
-                                            date_part = close_time.split('T')[0]
-                                            time_part = close_time.split('T')[1].split('+')[0].split('-')[0].split('Z')[0]
-                                            naive_dt = datetime.strptime(f"{date_part} {time_part}", "%Y-%m-%d %H:%M:%S")
-                                            dt_utc = naive_dt.replace(tzinfo=utc_tz)
-                                            close_dt = dt_utc.astimezone(est_tz)
-                                    else:
-                                        # Non-ISO format - assume UTC, then convert to EST
-                                        naive_dt = datetime.strptime(close_time, "%Y-%m-%d %H:%M:%S")
-                                        dt_utc = naive_dt.replace(tzinfo=utc_tz)
-                                        close_dt = dt_utc.astimezone(est_tz)
+                                    close_dt = _parse_kalshi_time(close_time)
                                     
                                     # DO NOT subtract 3 hours - match start time fields are already correct
                                     # The 3-hour subtraction was causing incorrect calculations
@@ -997,7 +1145,7 @@ class AutoTrader:
                                 
                                 if close_dt:
                                     # Work entirely in EST for calculations
-                                    now = datetime.now(est_tz)
+                                    now = self._scan_now
                                     time_diff_minutes = (close_dt - now).total_seconds() / 60
                                     time_diff_hours = time_diff_minutes / 60
                                     
@@ -1088,6 +1236,10 @@ class AutoTrader:
                 logger.info(f"{'=' * 70}")
                 
                 batch_trades = []
+                # Re-read the clock so place_trade's start-time buffer isn't measured from scan start
+                self._scan_now = datetime.now(_EST_CALC_TZ)
+                # Fetch the batch's orderbooks concurrently; trades are still placed one by one
+                orderbooks = self._prefetch_orderbooks(current_batch)
                 for i, opp in enumerate(current_batch, 1):
                     value = opp.get("value", 0)
                     trade_value = opp.get("trade_value", abs(value))  # Use trade_value (already absolute) if available
@@ -1117,7 +1269,7 @@ class AutoTrader:
                         if yes_price and no_price:
                             logger.info(f"      Kalshi Odds: YES @ {yes_price:.1f}¢ | NO @ {no_price:.1f}¢")
                         logger.info(f"      🎯 BET ON: {bet_on_player} @ {yes_price:.1f}¢ | Edge: {trade_value:.1%} | EV: {ev:+.1%}")
-                        trade_result = self.place_trade(opp)
+                        trade_result = self.place_trade(opp, orderbook=orderbooks.get(ticker))
                         if trade_result:
                             batch_trades.append(trade_result)
                             all_trades_placed.append(trade_result)
@@ -1211,6 +1363,8 @@ class AutoTrader:
         except Exception as e:
             logger.error(f"Error in scan_and_trade: {e}", exc_info=True)
             return []
+        finally:
+            self._scan_now = None
     
     def start_trading_loop(self, loop_interval_minutes: int = 15):
         """
@@ -1219,6 +1373,7 @@ class AutoTrader:
         Args:
             loop_interval_minutes: Minutes between trading scans (default 15)
         """
+        setup_logging()
         with self._trading_loop_lock:
             if self._trading_loop_running:
                 logger.warning("Trading loop is already running!")
@@ -1324,14 +1479,28 @@ class AutoTrader:
         with self._trading_loop_lock:
             return self._trading_loop_running
     
-    def run_continuous(self):
+    def run_continuous(self, adaptive: bool = False, max_scan_interval: Optional[float] = None):
         """
         Run continuous trading loop (blocking version, for backward compatibility).
         
         NOTE: Prefer start_trading_loop() for non-blocking background execution.
+        
+        Args:
+            adaptive: If True, back off (x1.5 per scan) while scans find nothing to trade,
+                     and drop straight back to scan_interval once opportunities appear
+            max_scan_interval: Upper bound for the adaptive interval in seconds
+                              (default: 10x scan_interval)
         """
+        setup_logging()
+        base_interval = self.scan_interval
+        if max_scan_interval is None:
+            max_scan_interval = base_interval * 10
+        interval = base_interval
+        
         logger.info("Starting continuous trading loop...")
         logger.info(f"Scan interval: {self.scan_interval} seconds")
+        if adaptive:
+            logger.info(f"Adaptive polling: up to {max_scan_interval} seconds while idle")
         logger.info(f"Dry run mode: {self.dry_run}")
         
         try:
@@ -1349,15 +1518,22 @@ class AutoTrader:
                                   f"{trade.get('count', 0)} contracts @ "
                                   f"{trade.get('price', 0)} cents")
                 
+                # Pick next interval: fast while there is activity, back off while idle
+                if adaptive:
+                    if trades or self.last_scan_opportunities:
+                        interval = base_interval
+                    else:
+                        interval = min(interval * 1.5, max_scan_interval)
+                
                 # Wait for next scan
                 elapsed = time.time() - start_time
-                sleep_time = max(0, self.scan_interval - elapsed)
+                sleep_time = max(0, interval - elapsed)
                 
                 if sleep_time > 0:
                     logger.info(f"Sleeping for {sleep_time:.1f} seconds until next scan...")
                     time.sleep(sleep_time)
                 else:
-                    logger.warning(f"Scan took {elapsed:.1f}s, longer than interval {self.scan_interval}s")
+                    logger.warning(f"Scan took {elapsed:.1f}s, longer than interval {interval:.0f}s")
                     
         except KeyboardInterrupt:
             logger.info("Stopping continuous trading loop...")
@@ -1368,9 +1544,9 @@ class AutoTrader:
     def get_trade_summary(self) -> Dict[str, Any]:
         """Get summary of all trades placed."""
         return {
-            "total_trades": len(self.trade_history),
-            "traded_markets": len(self.traded_markets),
-            "trades": self.trade_history,
+            "total_trades": self.total_trades,
+            "traded_events": len(self.traded_events),
+            "trades": [record._asdict() for record in self.trade_history],
         }
 
 
@@ -1411,8 +1587,8 @@ def create_auto_trader(
     )
     
     # Initialize analyzer
-    player_db = PlayerStatsDB(raw_data_dir=str(RAW_DATA_DIR))
-    predictor = MatchPredictor(models_dir=str(MODELS_DIR))
+    player_db = get_player_db(str(RAW_DATA_DIR))
+    predictor = get_predictor(str(MODELS_DIR))
     analyzer = KalshiMarketAnalyzer(
         kalshi_client=client,
         player_db=player_db,
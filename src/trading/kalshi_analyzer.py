@@ -4,6 +4,8 @@ and generates predictions for value trading opportunities.
 """
 
 import re
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple, Any
 from difflib import SequenceMatcher
 from datetime import datetime, timedelta, timezone
@@ -24,6 +26,10 @@ from src.trading.kalshi_client import KalshiClient
 from src.trading.kalshi_discovery import fetch_events, flatten_markets, filter_tennis_markets
 from src.api.player_stats import PlayerStatsDB
 from src.api.predictor import MatchPredictor
+from src.trading._value_kernel import TRADE_EDGE_THRESHOLD, select_tradable
+
+# Threads fetching fresh market volumes while scan_markets does CPU-side analysis
+VOLUME_FETCH_WORKERS = 4
 
 
 def format_time_est(dt: datetime) -> str:
@@ -77,6 +83,12 @@ class KalshiMarketAnalyzer:
         self.player_db = player_db
         self.predictor = predictor
         
+        # Resolved Kalshi name -> DB name, keyed on the cleaned (stripped, lowercased)
+        # Kalshi name. The same players recur across many markets in a scan, so this
+        # skips the SequenceMatcher passes on repeat lookups.
+        self._name_match_cache: Dict[str, Optional[str]] = {}
+        self._name_match_cache_db: Optional[PlayerStatsDB] = None
+        
         # Common tennis tournament keywords to filter markets
         self.tennis_keywords = [
             "tennis", "atp", "grand slam", "wimbledon", 
@@ -992,8 +1004,31 @@ class KalshiMarketAnalyzer:
         """
         kalshi_name_clean = kalshi_name.strip().lower()
         
+        # Cache is only valid for the database it was built against
+        if player_db is not self._name_match_cache_db:
+            self.clear_name_match_cache()
+            self._name_match_cache_db = player_db
+        
+        if kalshi_name_clean in self._name_match_cache:
+            matched = self._name_match_cache[kalshi_name_clean]
+            if debug:
+                print(f"    Matching '{kalshi_name}' → cached: '{matched}'")
+            return matched
+        
+        matched = self._match_player_name_uncached(kalshi_name_clean, player_db, debug=debug)
+        self._name_match_cache[kalshi_name_clean] = matched
+        return matched
+    
+    def clear_name_match_cache(self) -> None:
+        """Drop cached name matches (call after reloading the player database)."""
+        self._name_match_cache.clear()
+    
+    def _match_player_name_uncached(self, kalshi_name_clean: str,
+                                    player_db: PlayerStatsDB,
+                                    debug: bool = False) -> Optional[str]:
+        """Fuzzy-match an already cleaned Kalshi name against the database."""
         if debug:
-            print(f"    Matching '{kalshi_name}' (cleaned: '{kalshi_name_clean}')")
+            print(f"    Matching '{kalshi_name_clean}'")
         
         # Direct match
         if kalshi_name_clean in player_db.name_to_id:
@@ -1558,13 +1593,39 @@ class KalshiMarketAnalyzer:
             Analysis dictionary with predictions and value calculations,
             or None if market cannot be analyzed
         """
+        context, early_result = self._prepare_market_analysis(
+            market, surface=surface, best_of_5=best_of_5, round_code=round_code,
+            tourney_level_code=tourney_level_code, debug=debug
+        )
+        if context is None:
+            return early_result
+        
+        # Use symmetry enforcement to ensure consistent predictions
+        predictions = self.predictor.predict(context["features"], enforce_symmetry=True)
+        return self._complete_market_analysis(context, predictions, min_value=min_value, min_ev=min_ev, debug=debug)
+    
+    def _prepare_market_analysis(self, market: Dict[str, Any],
+                                 surface: Optional[str] = None,
+                                 best_of_5: Optional[bool] = None,
+                                 round_code: Optional[int] = None,
+                                 tourney_level_code: Optional[int] = None,
+                                 debug: bool = False) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Everything in analyze_market up to model inference: parse and match players,
+        look up stats and build the feature row.
+        
+        Returns:
+            Tuple of (context, early_result). context holds the feature row and matched
+            players for _complete_market_analysis; if the market can't be analyzed,
+            context is None and early_result is the final (non-tradable) analysis.
+        """
         if not self.player_db or not self.predictor:
             raise ValueError("PlayerStatsDB and MatchPredictor must be initialized")
         
         # Parse player names
         players = self.parse_player_names(market)
         if not players:
-            return {
+            return None, {
                 "market": market,
                 "ticker": market.get("ticker"),
                 "title": market.get("title"),
@@ -1664,7 +1725,7 @@ class KalshiMarketAnalyzer:
             if not db_p2:
                 missing.append(f"'{kalshi_p2}'")
             
-            return {
+            return None, {
                 "market": market,
                 "ticker": market.get("ticker"),
                 "title": market.get("title"),
@@ -1683,7 +1744,7 @@ class KalshiMarketAnalyzer:
         p2_id = self.player_db.find_player(db_p2)
         
         if not p1_id or not p2_id:
-            return {
+            return None, {
                 "market": market,
                 "ticker": market.get("ticker"),
                 "title": market.get("title"),
@@ -1699,7 +1760,7 @@ class KalshiMarketAnalyzer:
         p2_stats = self.player_db.get_player_stats(p2_id)
         
         if not p1_stats or not p2_stats:
-            return {
+            return None, {
                 "market": market,
                 "ticker": market.get("ticker"),
                 "title": market.get("title"),
@@ -1736,8 +1797,45 @@ class KalshiMarketAnalyzer:
             h2h_diff=h2h_diff
         )
         
-        # Use symmetry enforcement to ensure consistent predictions
-        predictions = self.predictor.predict(features, enforce_symmetry=True)
+        context = {
+            "market": market,
+            "surface": surface,
+            "best_of_5": best_of_5,
+            "round_code": round_code,
+            "tourney_level_code": tourney_level_code,
+            "kalshi_players": (kalshi_p1, kalshi_p2),
+            "matched_players": (db_p1, db_p2),
+            "player_ids": (p1_id, p2_id),
+            "h2h_diff": h2h_diff,
+            "asked_is_p1": asked_is_p1,
+            "asked_is_p2": asked_is_p2,
+            "features": features,
+        }
+        return context, None
+    
+    def _resolve_market_odds(self, context: Dict[str, Any],
+                             predictions: Dict[str, Optional[float]],
+                             debug: bool = False) -> Tuple[Optional[Dict[str, float]], Optional[Dict[str, Any]]]:
+        """
+        First step of _complete_market_analysis: Kalshi odds, and the checks that end the
+        analysis early (no odds, no XGBoost prediction).
+        
+        Args:
+            context: Context returned by _prepare_market_analysis
+            predictions: Model predictions for context["features"]
+            
+        Returns:
+            (kalshi_odds, None) when the analysis can continue, else (None, early result dict)
+        """
+        market = context["market"]
+        surface = context["surface"]
+        best_of_5 = context["best_of_5"]
+        round_code = context["round_code"]
+        tourney_level_code = context["tourney_level_code"]
+        kalshi_p1, kalshi_p2 = context["kalshi_players"]
+        db_p1, db_p2 = context["matched_players"]
+        p1_id, p2_id = context["player_ids"]
+        h2h_diff = context["h2h_diff"]
         
         if debug:
             print(f"  Model prediction parameters:")
@@ -1778,7 +1876,7 @@ class KalshiMarketAnalyzer:
                     "no_odds": 1.0 / (1 - yes_prob) if (1 - yes_prob) > 0 else None
                 }
             else:
-                return {
+                return None, {
                     "market": market,
                     "ticker": market.get("ticker"),
                     "title": market.get("title"),
@@ -1795,7 +1893,7 @@ class KalshiMarketAnalyzer:
         xgboost_prediction = predictions.get("xgboost")
         
         if xgboost_prediction is None:
-            return {
+            return None, {
                 "market": market,
                 "ticker": market.get("ticker"),
                 "title": market.get("title"),
@@ -1807,7 +1905,48 @@ class KalshiMarketAnalyzer:
                 "reason": "XGBoost model failed to generate prediction or model not loaded"
             }
         
-        avg_prediction = xgboost_prediction
+        return kalshi_odds, None
+    
+    def _complete_market_analysis(self, context: Dict[str, Any],
+                                  predictions: Dict[str, Optional[float]],
+                                  min_value: float = 0.05,
+                                  min_ev: float = 0.10,
+                                  debug: bool = False,
+                                  kalshi_odds: Optional[Dict[str, float]] = None,
+                                  volume_future: Optional[Future] = None) -> Dict[str, Any]:
+        """
+        Everything in analyze_market after model inference: odds, value, EV and trade side.
+        
+        Args:
+            context: Context returned by _prepare_market_analysis
+            predictions: Model predictions for context["features"] (from MatchPredictor.predict)
+            kalshi_odds: Odds already returned by _resolve_market_odds for this context
+                        (resolved here when not provided)
+            volume_future: Optional in-flight _get_market_volume(fetch_fresh=True) call;
+                          fetched synchronously when not provided
+            
+        Returns:
+            Analysis dictionary
+        """
+        if kalshi_odds is None:
+            kalshi_odds, early_result = self._resolve_market_odds(context, predictions, debug=debug)
+            if kalshi_odds is None:
+                return early_result
+        
+        market = context["market"]
+        surface = context["surface"]
+        best_of_5 = context["best_of_5"]
+        round_code = context["round_code"]
+        tourney_level_code = context["tourney_level_code"]
+        kalshi_p1, kalshi_p2 = context["kalshi_players"]
+        db_p1, db_p2 = context["matched_players"]
+        p1_id, p2_id = context["player_ids"]
+        h2h_diff = context["h2h_diff"]
+        asked_is_p1 = context["asked_is_p1"]
+        asked_is_p2 = context["asked_is_p2"]
+        
+        # Use XGBoost model only (preferred model; checked by _resolve_market_odds)
+        avg_prediction = predictions.get("xgboost")
         
         # The model predicts probability that player1 (p1) wins
         # But we need to check which player Kalshi is asking about
@@ -1846,10 +1985,10 @@ class KalshiMarketAnalyzer:
         trade_value = None
         reason = []
         
-        if value > 0.05:  # Model thinks higher probability than Kalshi
+        if value > TRADE_EDGE_THRESHOLD:  # Model thinks higher probability than Kalshi
             trade_side = "yes"  # Buy YES (bet on asked player)
             trade_value = value
-        elif value < -0.05:  # Model thinks lower probability than Kalshi
+        elif value < -TRADE_EDGE_THRESHOLD:  # Model thinks lower probability than Kalshi
             trade_side = "no"  # Buy NO (bet against asked player)
             trade_value = abs(value)
         
@@ -1891,16 +2030,19 @@ class KalshiMarketAnalyzer:
             if abs(value) < 0.02:
                 reason.append(f"Model ({model_prob:.1%}) and Kalshi ({kalshi_prob:.1%}) are very close - no edge")
             elif value > 0:
-                reason.append(f"Model predicts {model_prob:.1%} vs Kalshi {kalshi_prob:.1%} (+{value:.1%}), but below 5% threshold")
+                reason.append(f"Model predicts {model_prob:.1%} vs Kalshi {kalshi_prob:.1%} (+{value:.1%}), but below {TRADE_EDGE_THRESHOLD:.0%} threshold")
             else:
-                reason.append(f"Model predicts {model_prob:.1%} vs Kalshi {kalshi_prob:.1%} ({value:.1%}), but below 5% threshold")
+                reason.append(f"Model predicts {model_prob:.1%} vs Kalshi {kalshi_prob:.1%} ({value:.1%}), but below {TRADE_EDGE_THRESHOLD:.0%} threshold")
             if expected_value < min_ev:
                 reason.append(f"Expected value {expected_value:.1%} below {min_ev:.1%} threshold")
             else:
                 reason.append(f"Expected value: {expected_value:.1%}")
         
         # Get market volume for ranking (fetch fresh data to ensure accuracy)
-        market_volume = self._get_market_volume(market, fetch_fresh=True)
+        if volume_future is not None:
+            market_volume = volume_future.result()
+        else:
+            market_volume = self._get_market_volume(market, fetch_fresh=True)
         
         if debug:
             if market_volume:
@@ -2218,19 +2360,59 @@ class KalshiMarketAnalyzer:
         
         failed_analyses = []  # Track markets that failed analysis entirely
         
+        # Preallocated buffers (one slot per analysis) of the analyzer's own trade value /
+        # EV / tradable results, for the batched threshold kernel
+        trade_v = np.zeros(len(markets), dtype=np.float64)
+        ev_v = np.zeros(len(markets), dtype=np.float64)
+        tradable_v = np.zeros(len(markets), dtype=np.bool_)
+        
         # First pass: analyze all markets (don't add to tradable yet - we'll filter in second pass)
+        # Player matching and feature building run per market; the models then score every
+        # feature row in one batched call instead of once per market
+        prepared = []
         for i, market in enumerate(markets):
             if (i + 1) % 10 == 0:
                 print(f" {i + 1}/{len(markets)}", end="", flush=True)
+            prepared.append(self._prepare_market_analysis(market, debug=debug))
+        
+        batch_features = [context["features"] for context, _ in prepared if context is not None]
+        batch_predictions = iter(self.predictor.predict_batch(batch_features, enforce_symmetry=True))
+        
+        # Fresh-volume lookups (one API call per market that has odds and a prediction) are
+        # all started before any analysis waits on one, so the round trips overlap each other
+        # and the value / EV work. Lookups still queued are cancelled if the scan fails.
+        volume_fetcher = ThreadPoolExecutor(max_workers=VOLUME_FETCH_WORKERS)
+        try:
+            staged = []  # (context, predictions, kalshi_odds, volume_future, early_result)
+            for context, early_result in prepared:
+                if context is None:
+                    staged.append((None, None, None, None, early_result))
+                    continue
+                predictions = next(batch_predictions)
+                kalshi_odds, early_result = self._resolve_market_odds(context, predictions, debug=debug)
+                volume_future = None
+                if kalshi_odds is not None:
+                    volume_future = volume_fetcher.submit(self._get_market_volume, context["market"], True)
+                staged.append((context, predictions, kalshi_odds, volume_future, early_result))
             
+            analyses = [
+                early_result if kalshi_odds is None
+                else self._complete_market_analysis(
+                    context, predictions, min_value=min_value, min_ev=min_ev, debug=debug,
+                    kalshi_odds=kalshi_odds, volume_future=volume_future
+                )
+                for context, predictions, kalshi_odds, volume_future, early_result in staged
+            ]
+        finally:
+            volume_fetcher.shutdown(wait=False, cancel_futures=True)
+        
+        for market, analysis in zip(markets, analyses):
             # Get total match volume (sum of all markets for this event)
             event_ticker = market.get("event_ticker")
             total_match_volume = None
             if event_ticker and event_ticker in event_volumes:
                 total_match_volume = event_volumes[event_ticker]
             
-            analysis = self.analyze_market(market, min_value=min_value, min_ev=min_ev, debug=debug)
-            
             if analysis:
                 # Override market volume with total match volume if available
                 if total_match_volume is not None:
@@ -2241,6 +2423,12 @@ class KalshiMarketAnalyzer:
                         individual_vol_str = f"${individual_vol:,.0f}" if individual_vol is not None else "N/A"
                         print(f"  Market {market.get('ticker', 'Unknown')}: Individual volume {individual_vol_str}, Total match volume ${total_match_volume:,.0f}")
                 
+                if analysis.get("tradable"):
+                    slot = len(all_analyses)
+                    trade_v[slot] = analysis.get("trade_value") or 0.0
+                    ev_v[slot] = analysis.get("expected_value", 0)
+                    tradable_v[slot] = True
+                
                 all_analyses.append(analysis)
             else:
                 # Market failed analysis (e.g., player matching failed, no odds, etc.)
@@ -2255,10 +2443,17 @@ class KalshiMarketAnalyzer:
         if debug:
             print(f"   Analyzed: {len(all_analyses)} | Failed: {len(failed_analyses)}")
         
+        # Apply the value/EV thresholds to every analyzed market in one kernel call
+        n_analyzed = len(all_analyses)
+        tradable_mask = select_tradable(
+            trade_v[:n_analyzed], ev_v[:n_analyzed], tradable_v[:n_analyzed], min_value, min_ev
+        )
+        passing = set(np.flatnonzero(tradable_mask).tolist())
+        
         # Second pass: Group by event/match and select only the favored player's opportunity
-        # Group analyses by event_ticker (markets for the same match)
+        # Group analysis indices by event_ticker (markets for the same match)
         match_groups = {}
-        for analysis in all_analyses:
+        for idx, analysis in enumerate(all_analyses):
             event_ticker = analysis.get("market", {}).get("event_ticker")
             if not event_ticker:
                 # Try to extract from ticker: KXATPMATCH-26JAN03SWEOCO-THO -> KXATPMATCH-26JAN03SWEOCO
@@ -2271,41 +2466,31 @@ class KalshiMarketAnalyzer:
             if event_ticker:
                 if event_ticker not in match_groups:
                     match_groups[event_ticker] = []
-                match_groups[event_ticker].append(analysis)
+                match_groups[event_ticker].append(idx)
         
         # For each match, keep the best opportunity (highest EV) across all markets
         # This evaluates both YES and NO sides and picks the best one
-        for event_ticker, match_analyses in match_groups.items():
-            if len(match_analyses) < 2:
+        for event_ticker, match_indices in match_groups.items():
+            if len(match_indices) < 2:
                 # Only one market for this match, process normally
-                for analysis in match_analyses:
-                    if analysis.get("tradable") and analysis.get("trade_value", 0) >= min_value:
-                        if analysis.get("expected_value", 0) >= min_ev:
-                            tradable.append(analysis)
+                for idx in match_indices:
+                    if idx in passing:
+                        tradable.append(all_analyses[idx])
                 continue
             
             # Multiple markets for the same match - keep the one with best EV
             # This ensures we consider both YES and NO trades
-            best_analysis = None
+            best_idx = None
             best_ev = -float('inf')
             
-            for analysis in match_analyses:
-                if not analysis.get("tradable", False):
-                    continue
-                
-                # Check thresholds
-                trade_value = analysis.get("trade_value", 0)
-                ev = analysis.get("expected_value", 0)
-                
-                if trade_value >= min_value and ev >= min_ev:
-                    if ev > best_ev:
-                        best_ev = ev
-                        best_analysis = analysis
+            for idx in match_indices:
+                if idx in passing and ev_v[idx] > best_ev:
+                    best_ev = ev_v[idx]
+                    best_idx = idx
             
             # Add the best opportunity (if found)
-            if best_analysis:
-                tradable.append(best_analysis)
-                # Removed debug print statement - these messages appear after SCAN COMPLETE and clutter the logs
+            if best_idx is not None:
+                tradable.append(all_analyses[best_idx])
         
         if debug:
             print(f"   Tradable opportunities: {len(tradable)} (after grouping by match)")
@@ -6,10 +6,14 @@ Handles authentication, signing, and API requests.
 
 import os
 import base64
+import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
 import time
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from enum import Enum
 from datetime import datetime, timedelta
 from cryptography.hazmat.primitives import serialization
@@ -18,6 +22,17 @@ from cryptography.hazmat.primitives.asymmetric import padding, rsa
 from cryptography.hazmat.backends import default_backend
 from cryptography.exceptions import InvalidSignature
 
+try:
+    import orjson  # Faster JSON (optional)
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps  # bytes - fine as a request body
+except ImportError:
+    import json
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+logger = logging.getLogger(__name__)
+
 
 class Environment(Enum):
     """Kalshi API environment."""
@@ -25,6 +40,12 @@ class Environment(Enum):
     PROD = "prod"
 
 
+# How long a signed header is reused for repeat calls to the same method + path.
+# The signature covers timestamp + method + path (no query string), so e.g. every
+# get_markets page within this window shares one RSA signature.
+SIGNATURE_REUSE_SECONDS = 5.0
+
+
 class KalshiBaseClient:
     """Base client class for interacting with the Kalshi API."""
     
@@ -46,6 +67,14 @@ class KalshiBaseClient:
         self.private_key = private_key
         self.environment = environment
         
+        # PSS parameters are the same for every request - build them once
+        self._pss_padding = padding.PSS(
+            mgf=padding.MGF1(hashes.SHA256()),
+            salt_length=padding.PSS.DIGEST_LENGTH
+        )
+        # (method, path) -> (monotonic time signed, headers); see request_headers
+        self._header_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+        
         if self.environment == Environment.DEMO:
             self.HTTP_BASE_URL = "https://demo-api.kalshi.co"
             self.WS_BASE_URL = "wss://demo-api.kalshi.co"
@@ -66,13 +95,20 @@ class KalshiBaseClient:
         Returns:
             Dictionary of headers
         """
-        current_time_milliseconds = int(time.time() * 1000)
-        timestamp_str = str(current_time_milliseconds)
-        
         # Remove query params from path for signing
         path_parts = path.split('?')
         path_without_query = path_parts[0]
         
+        # Reuse a recent signature for the same method + path (RSA signing is the expensive part)
+        cache_key = (method, path_without_query)
+        now = time.monotonic()
+        cached = self._header_cache.get(cache_key)
+        if cached and now - cached[0] < SIGNATURE_REUSE_SECONDS:
+            return dict(cached[1])
+        
+        current_time_milliseconds = int(time.time() * 1000)
+        timestamp_str = str(current_time_milliseconds)
+        
         msg_string = timestamp_str + method + path_without_query
         signature = self.sign_pss_text(msg_string)
         
@@ -82,7 +118,8 @@ class KalshiBaseClient:
             "KALSHI-ACCESS-SIGNATURE": signature,
             "KALSHI-ACCESS-TIMESTAMP": timestamp_str,
         }
-        return headers
+        self._header_cache[cache_key] = (now, headers)
+        return dict(headers)
     
     def sign_pss_text(self, text: str) -> str:
         """
@@ -98,10 +135,7 @@ class KalshiBaseClient:
         try:
             signature = self.private_key.sign(
                 message,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.DIGEST_LENGTH
-                ),
+                self._pss_padding,
                 hashes.SHA256()
             )
             return base64.b64encode(signature).decode('utf-8')
@@ -109,6 +143,32 @@ class KalshiBaseClient:
             raise ValueError("RSA sign PSS failed") from e
 
 
+# Keep-alive connection pool for the API host (sized above the scan's volume prefetch workers)
+HTTP_POOL_SIZE = 10
+
+# Most tickers requested per bulk orderbook call
+ORDERBOOK_BATCH_SIZE = 100
+
+
+def _make_session() -> requests.Session:
+    """
+    Build a pooled session for the Kalshi API.
+    
+    Only idempotent GETs are retried (with back-off) on rate limiting / server errors;
+    order POSTs and DELETEs are never replayed.
+    """
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,  # Hand the final response to raise_if_bad_response
+    )
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_maxsize=HTTP_POOL_SIZE, max_retries=retry))
+    return session
+
+
 class KalshiHttpClient(KalshiBaseClient):
     """Client for handling HTTP connections to the Kalshi API."""
     
@@ -124,16 +184,31 @@ class KalshiHttpClient(KalshiBaseClient):
         self.markets_url = "/trade-api/v2/markets"
         self.portfolio_url = "/trade-api/v2/portfolio"
         self.last_api_call = datetime.now()
+        self._rate_limit_lock = threading.Lock()
+        # Reused across calls so the TCP/TLS connection is kept alive
+        self.session = _make_session()
+    
+    def close(self) -> None:
+        """Close pooled HTTP connections."""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def rate_limit(self) -> None:
         """Built-in rate limiter to prevent exceeding API rate limits."""
         THRESHOLD_IN_MILLISECONDS = 100
-        now = datetime.now()
         threshold_in_microseconds = 1000 * THRESHOLD_IN_MILLISECONDS
         threshold_in_seconds = THRESHOLD_IN_MILLISECONDS / 1000
-        if now - self.last_api_call < timedelta(microseconds=threshold_in_microseconds):
-            time.sleep(threshold_in_seconds)
-        self.last_api_call = datetime.now()
+        # Serialized so concurrent callers (e.g. scan volume prefetch) still respect the spacing
+        with self._rate_limit_lock:
+            now = datetime.now()
+            if now - self.last_api_call < timedelta(microseconds=threshold_in_microseconds):
+                time.sleep(threshold_in_seconds)
+            self.last_api_call = datetime.now()
     
     def raise_if_bad_response(self, response: requests.Response) -> None:
         """Raises an HTTPError if the response status code indicates an error."""
@@ -143,14 +218,14 @@ class KalshiHttpClient(KalshiBaseClient):
     def post(self, path: str, body: dict) -> Any:
         """Performs an authenticated POST request to the Kalshi API."""
         self.rate_limit()
-        response = requests.post(
+        response = self.session.post(
             self.host + path,
-            json=body,
+            data=_json_dumps(body),
             headers=self.request_headers("POST", path),
             timeout=10
         )
         self.raise_if_bad_response(response)
-        return response.json()
+        return _json_loads(response.content)
     
     def get(self, path: str, params: Dict[str, Any] = {}) -> Any:
         """Performs an authenticated GET request to the Kalshi API."""
@@ -162,14 +237,14 @@ class KalshiHttpClient(KalshiBaseClient):
             query_string = '&'.join([f"{k}={v}" for k, v in params.items()])
             full_path = f"{path}?{query_string}"
         
-        response = requests.get(
+        response = self.session.get(
             self.host + path,
             headers=self.request_headers("GET", full_path),
             params=params,
             timeout=10
         )
         self.raise_if_bad_response(response)
-        return response.json()
+        return _json_loads(response.content)
     
     def delete(self, path: str, params: Dict[str, Any] = {}) -> Any:
         """Performs an authenticated DELETE request to the Kalshi API."""
@@ -181,14 +256,14 @@ class KalshiHttpClient(KalshiBaseClient):
             query_string = '&'.join([f"{k}={v}" for k, v in params.items()])
             full_path = f"{path}?{query_string}"
         
-        response = requests.delete(
+        response = self.session.delete(
             self.host + path,
             headers=self.request_headers("DELETE", full_path),
             params=params,
             timeout=10
         )
         self.raise_if_bad_response(response)
-        return response.json()
+        return _json_loads(response.content)
     
     def get_balance(self) -> Dict[str, Any]:
         """Retrieves the account balance."""
@@ -272,6 +347,31 @@ class KalshiHttpClient(KalshiBaseClient):
         """
         return self.get(f"/trade-api/v2/markets/{ticker}/orderbook")
     
+    def get_orderbooks_bulk(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get orderbooks for many markets with one request per ORDERBOOK_BATCH_SIZE tickers.
+        
+        Args:
+            tickers: Market ticker symbols
+            
+        Returns:
+            Dict of ticker -> {"orderbook": ...} (same shape as get_orderbook);
+            tickers missing from the response are left out
+        """
+        books = {}
+        for start in range(0, len(tickers), ORDERBOOK_BATCH_SIZE):
+            batch = tickers[start:start + ORDERBOOK_BATCH_SIZE]
+            response = self.get(self.markets_url + "/orderbooks", params={"tickers": ",".join(batch)})
+            if "orderbooks" not in response:
+                logger.warning("Bulk orderbook response has no 'orderbooks' key (keys: %s)",
+                               sorted(response))
+                continue
+            for entry in response["orderbooks"]:
+                ticker = entry.get("ticker")
+                if ticker:
+                    books[ticker] = {"orderbook": entry.get("orderbook", {})}
+        return books
+    
     def place_order(
         self,
         ticker: str,
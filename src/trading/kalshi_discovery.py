@@ -3,6 +3,8 @@ Kalshi Market Discovery - Search for events and filter markets.
 Fetches events by keyword, extracts markets, and applies robust layered filtering.
 """
 
+import re
+from functools import lru_cache, partial
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timezone, timedelta
 from src.trading.kalshi_client import KalshiClient
@@ -72,6 +74,18 @@ WTA_EXCLUSION_KEYWORDS = [
 ]
 
 
+def _compile_keywords(keywords: List[str]) -> "re.Pattern[str]":
+    """Compile a keyword list into one case-insensitive substring alternation."""
+    return re.compile("|".join(re.escape(kw) for kw in keywords), re.IGNORECASE)
+
+
+# Pre-compiled keyword filters (one regex scan per text instead of one `in` per keyword)
+_WTA_EXCLUSION_RE = _compile_keywords(WTA_EXCLUSION_KEYWORDS)
+_TENNIS_KEYWORDS_RE = _compile_keywords(TENNIS_KEYWORDS + TENNIS_SERIES_TICKERS)
+_EXCLUSION_RE = _compile_keywords(EXCLUSION_KEYWORDS)
+_VS_RE = re.compile(r" vs\.? | v\. ", re.IGNORECASE)
+
+
 def fetch_events(
     client: KalshiClient,
     keyword: str = "tennis",
@@ -205,36 +219,21 @@ def layer1_series_category(event: Dict[str, Any], market: Dict[str, Any]) -> Opt
     
     Returns None if passes (or not applicable), or rejection reason if fails.
     """
-    series_ticker = event.get("series_ticker", "").lower()
-    category = event.get("category", "").lower()
-    market_ticker = market.get("ticker", "").lower()
-    event_title = event.get("event_title", "").lower()
-    market_title = market.get("title", "").lower()
+    series_ticker = event.get("series_ticker", "")
+    category = event.get("category", "")
+    market_ticker = market.get("ticker", "")
+    event_title = event.get("event_title", "")
+    market_title = market.get("title", "")
     
-    # CRITICAL: Explicitly reject WTA markets
+    # CRITICAL: Explicitly reject WTA markets (pattern is case-insensitive - no lowercased copies)
     full_text = f"{event_title} {market_title} {series_ticker} {category} {market_ticker}"
-    if any(wta_kw in full_text for wta_kw in WTA_EXCLUSION_KEYWORDS):
+    if _WTA_EXCLUSION_RE.search(full_text):
         return "wta_market_excluded"
     
-    # Check series ticker patterns (e.g., KXATPMATCH, KXUNITEDCUPMATCH) - ATP only
-    if series_ticker and any(pattern in series_ticker for pattern in TENNIS_SERIES_TICKERS):
-        return None  # Pass - strong signal from series ticker
-    
-    # Check if market ticker itself contains tennis series pattern
-    # Format: KXATPMATCH-26JAN03SWEOCO
-    if market_ticker:
-        # Check if ticker starts with a tennis series pattern
-        ticker_parts = market_ticker.split("-")
-        if ticker_parts:
-            ticker_prefix = ticker_parts[0].lower()
-            if any(pattern in ticker_prefix for pattern in TENNIS_SERIES_TICKERS):
-                return None  # Pass - strong signal from market ticker
-    
-    # Check category
-    if category and ("tennis" in category or "sports" in category):
-        return None  # Pass - category indicates tennis
-    
-    # Don't reject if not found - this is optional layer
+    # Positive signals - series ticker (e.g., KXATPMATCH, KXUNITEDCUPMATCH), market ticker
+    # prefix (KXATPMATCH-26JAN03SWEOCO) or a tennis/sports category - all pass, and so does
+    # their absence (this is an optional layer), so there is nothing further to check here.
+    # Layer 2 does the keyword/series matching that can actually reject.
     return None
 
 
@@ -244,28 +243,24 @@ def layer2_tennis_keywords(event: Dict[str, Any], market: Dict[str, Any]) -> Opt
     
     Returns None if passes, or rejection reason if fails.
     """
-    event_title = event.get("event_title", "").lower()
-    event_description = event.get("event_description", "").lower()
-    market_title = market.get("title", "").lower()
-    market_subtitle = market.get("subtitle", "").lower()
-    series_ticker = event.get("series_ticker", "").lower()
-    market_ticker = market.get("ticker", "").lower()
-    
-    # Combine all text fields for keyword search
+    event_title = event.get("event_title", "")
+    event_description = event.get("event_description", "")
+    market_title = market.get("title", "")
+    market_subtitle = market.get("subtitle", "")
+    series_ticker = event.get("series_ticker", "")
+    market_ticker = market.get("ticker", "")
+    
+    # Combine all text fields for keyword search (patterns are case-insensitive)
     full_text = f"{event_title} {event_description} {market_title} {market_subtitle} {series_ticker} {market_ticker}"
     
     # CRITICAL: Explicitly reject WTA markets first
-    if any(wta_kw in full_text for wta_kw in WTA_EXCLUSION_KEYWORDS):
+    if _WTA_EXCLUSION_RE.search(full_text):
         return "wta_market_excluded"
     
-    # Check for at least one tennis keyword
-    if any(keyword in full_text for keyword in TENNIS_KEYWORDS):
+    # Check for at least one tennis keyword or series ticker pattern (e.g., kxatpmatch) - ATP only
+    if _TENNIS_KEYWORDS_RE.search(full_text):
         return None  # Pass
     
-    # Also check for series ticker patterns (e.g., kxatpmatch) - ATP only
-    if any(pattern in full_text for pattern in TENNIS_SERIES_TICKERS):
-        return None  # Pass - found tennis series ticker pattern
-    
     return "tennis_keywords"  # Fail
 
 
@@ -275,22 +270,25 @@ def layer3_match_structure(event: Dict[str, Any], market: Dict[str, Any]) -> Opt
     
     Returns None if passes, or rejection reason if fails.
     """
-    event_title = event.get("event_title", "").lower()
-    market_title = market.get("title", "").lower()
+    event_title = event.get("event_title", "")
+    market_title = market.get("title", "")
     full_title = f"{event_title} {market_title}"
     
     # CRITICAL: Explicitly reject WTA markets
-    if any(wta_kw in full_title for wta_kw in WTA_EXCLUSION_KEYWORDS):
+    if _WTA_EXCLUSION_RE.search(full_title):
         return "wta_market_excluded"
     
     # Must contain " vs " or " v. "
-    if " vs " not in full_title and " v. " not in full_title and " vs. " not in full_title:
+    if not _VS_RE.search(full_title):
         return "match_structure_no_vs"
     
     # Exclude if contains exclusion keywords
-    for exclusion in EXCLUSION_KEYWORDS:
-        if exclusion in full_title:
-            return f"match_structure_excluded_{exclusion.replace(' ', '_')}"
+    if _EXCLUSION_RE.search(full_title):
+        # Report the first keyword in list order (rejection path only)
+        full_title = full_title.lower()
+        for exclusion in EXCLUSION_KEYWORDS:
+            if exclusion in full_title:
+                return f"match_structure_excluded_{exclusion.replace(' ', '_')}"
     
     return None  # Pass
 
@@ -326,7 +324,39 @@ def layer4_market_structure(event: Dict[str, Any], market: Dict[str, Any]) -> Op
     return None  # Pass
 
 
-def layer5_expiration_window(event: Dict[str, Any], market: Dict[str, Any], max_hours: int = 72, min_minutes_before: int = 10, max_minutes_before: Optional[int] = None, min_volume_for_no_max: float = 5000) -> Optional[str]:
+@lru_cache(maxsize=4096)
+def _parse_close_time(close_time: str, est_tz) -> datetime:
+    """
+    Parse a Kalshi time string (UTC unless it carries an offset) into an EST datetime.
+    
+    Raises ValueError if the string can't be parsed.
+    """
+    utc_tz = timezone.utc
+    if 'T' in close_time:
+        # ISO format - check for timezone marker
+        if close_time.endswith('Z'):
+            # Explicitly UTC - parse as UTC, then convert to EST
+            dt_utc = datetime.fromisoformat(close_time.replace('Z', '+00:00'))
+            return dt_utc.astimezone(est_tz)
+        elif '+' in close_time or (close_time.count('-') > 2 and 'T' in close_time):
+            # Has timezone offset - parse as-is, then convert to EST
+            dt_parsed = datetime.fromisoformat(close_time)
+            return dt_parsed.astimezone(est_tz)
+        else:
+            # No timezone marker - assume UTC (Kalshi default), then convert to EST
+            date_part = close_time.split('T')[0]
+            time_part = close_time.split('T')[1].split('+')[0].split('-')[0].split('Z')[0]
+            naive_dt = datetime.strptime(f"{date_part} {time_part}", "%Y-%m-%d %H:%M:%S")
+            dt_utc = naive_dt.replace(tzinfo=utc_tz)
+            return dt_utc.astimezone(est_tz)
+    
+    # Non-ISO format - assume UTC, then convert to EST
+    naive_dt = datetime.strptime(close_time, "%Y-%m-%d %H:%M:%S")
+    dt_utc = naive_dt.replace(tzinfo=utc_tz)
+    return dt_utc.astimezone(est_tz)
+
+
+def layer5_expiration_window(event: Dict[str, Any], market: Dict[str, Any], max_hours: int = 72, min_minutes_before: int = 10, max_minutes_before: Optional[int] = None, min_volume_for_no_max: float = 5000, now: Optional[datetime] = None) -> Optional[str]:
     """
     Layer 5: Expiration window check.
     
@@ -343,6 +373,7 @@ def layer5_expiration_window(event: Dict[str, Any], market: Dict[str, Any], max_
         min_minutes_before: Minimum minutes before match start (default 10 minutes buffer)
         max_minutes_before: (Deprecated - no longer used, kept for compatibility)
         min_volume_for_no_max: (Deprecated - no longer used, kept for compatibility)
+        now: Timezone-aware current time (pass one value for a whole batch); defaults to now
     
     Returns None if passes, or rejection reason if fails.
     """
@@ -411,39 +442,18 @@ def layer5_expiration_window(event: Dict[str, Any], market: Dict[str, Any], max_
         # We MUST parse as UTC first, then convert to EST for all calculations
         if ZoneInfo:
             est_tz = ZoneInfo("America/New_York")
-            utc_tz = timezone.utc
         else:
             est_tz = timezone(timedelta(hours=-5))
-            utc_tz = timezone.utc
         
         if isinstance(close_time, str):
-            if 'T' in close_time:
-                # ISO format - check for timezone marker
-                if close_time.endswith('Z'):
-                    # Explicitly UTC - parse as UTC, then convert to EST
-                    dt_utc = datetime.fromisoformat(close_time.replace('Z', '+00:00'))
-                    close_dt = dt_utc.astimezone(est_tz)
-                elif '+' in close_time or (close_time.count('-') > 2 and 'T' in close_time):
-                    # Has timezone offset - parse as-is, then convert to EST
-                    dt_parsed = datetime.fromisoformat(close_time)
-                    close_dt = dt_parsed.astimezone(est_tz)
-                else:
-                    # No timezone marker - assume UTC (Kalshi default), then convert to EST
-                    date_part = close_time.split('T')[0]
-                    time_part = close_time.split('T')[1].split('+')[0].split('-')[0].split('Z')[0]
-                    naive_dt = datetime.strptime(f"{date_part} {time_part}", "%Y-%m-%d %H:%M:%S")
-                    dt_utc = naive_dt.replace(tzinfo=utc_tz)
-                    close_dt = dt_utc.astimezone(est_tz)
-            else:
-                # Non-ISO format - assume UTC, then convert to EST
-                naive_dt = datetime.strptime(close_time, "%Y-%m-%d %H:%M:%S")
-                dt_utc = naive_dt.replace(tzinfo=utc_tz)
-                close_dt = dt_utc.astimezone(est_tz)
+            # Cached - markets of the same event share the same close time string
+            close_dt = _parse_close_time(close_time, est_tz)
         else:
             return "expiration_window_invalid_format"
         
         # Work entirely in EST for calculations
-        now = datetime.now(est_tz)
+        if now is None:
+            now = datetime.now(est_tz)
         time_diff_hours = (close_dt - now).total_seconds() / 3600
         time_diff_minutes = (close_dt - now).total_seconds() / 60
         
@@ -469,12 +479,7 @@ def layer5_expiration_window(event: Dict[str, Any], market: Dict[str, Any], max_
                     time_val = market.get(field)
                     if time_val:
                         try:
-                            # Work entirely in EST
-                            if ZoneInfo:
-                                est_tz = ZoneInfo("America/New_York")
-                            else:
-                                est_tz = timezone(timedelta(hours=-5))
-                            
+                            # Work entirely in EST (est_tz from above)
                             if isinstance(time_val, str):
                                 if 'T' in time_val:
                                     # ISO format - extract and parse as EST
@@ -546,39 +551,36 @@ def layer5_expiration_window(event: Dict[str, Any], market: Dict[str, Any], max_
         return None
 
 
-def layer6_liquidity(event: Dict[str, Any], market: Dict[str, Any], min_volume: float = 200) -> Optional[str]:
+def _market_volume_dollars(market: Dict[str, Any]) -> float:
     """
-    Layer 6: Liquidity check.
+    A market's volume in dollars.
     
-    Returns None if passes, or rejection reason if fails.
+    volume_dollars / liquidity_dollars are already in dollars. Generic volume above 50k is
+    treated as cents (active markets typically trade $1k-$50k, which matches the website);
+    anything at or below 50k is assumed to be in dollars already.
     """
-    volume = market.get("volume_dollars") or market.get("liquidity_dollars") or market.get("volume", 0)
+    dollars = market.get("volume_dollars") or market.get("liquidity_dollars")
+    volume = dollars or market.get("volume", 0)
     
     # Convert to float if string
     try:
-        volume = float(volume) if volume else 0
+        volume = float(volume) if volume else 0.0
     except (ValueError, TypeError):
-        volume = 0
+        volume = 0.0
     
     # Convert volume units if needed
-    # If we got volume_dollars or liquidity_dollars, it's already in dollars
-    if market.get("volume_dollars") or market.get("liquidity_dollars"):
-        # Already in dollars, use as-is
-        pass
-    elif volume > 1000000:
-        # Very large number - definitely in cents, convert to dollars
+    if not dollars and volume > 50000:
         volume = volume / 100.0
-    elif volume > 100000:
-        # Large number - likely in cents, convert to dollars
-        volume = volume / 100.0
-    elif volume > 10000:
-        # Medium number - could be either, but for active markets volumes are typically $1k-$50k
-        # If it's in the 10k-100k range, it's probably already in dollars (matches website)
-        # Only convert if it's clearly in cents (e.g., > 50k)
-        if volume > 50000:
-            volume = volume / 100.0
-        # Otherwise assume already in dollars
-    # If < 10k, assume already in dollars
+    return volume
+
+
+def layer6_liquidity(event: Dict[str, Any], market: Dict[str, Any], min_volume: float = 200) -> Optional[str]:
+    """
+    Layer 6: Liquidity check.
+    
+    Returns None if passes, or rejection reason if fails.
+    """
+    volume = _market_volume_dollars(market)
     
     if volume < min_volume:
         return f"liquidity_too_low_{volume:.0f}"
@@ -586,6 +588,65 @@ def layer6_liquidity(event: Dict[str, Any], market: Dict[str, Any], min_volume:
     return None  # Pass
 
 
+# Layers 1-4: per-market text / structure checks (no thresholds)
+STRUCTURAL_LAYERS = [
+    ("series_category", layer1_series_category),
+    ("tennis_keywords", layer2_tennis_keywords),
+    ("match_structure", layer3_match_structure),
+    ("market_structure", layer4_market_structure),
+]
+
+
+def make_market_validator(
+    max_hours: int = 72,
+    min_volume: float = 200,
+    min_minutes_before: int = 10,
+    max_minutes_before: Optional[int] = None,
+    min_volume_for_no_max: float = 5000,
+    log_rejections: bool = False,
+    now: Optional[datetime] = None
+):
+    """
+    Build a validator with the scan's thresholds bound once.
+    
+    The returned function takes (event, market) and behaves exactly like
+    is_valid_tennis_market called with the same thresholds, without rebuilding
+    the layer list on every call.
+    
+    Args:
+        now: Fixed EST "now" for layer 5 (e.g. one instant for a whole batch);
+             None reads the clock on every call
+    
+    Returns:
+        Callable (event, market) -> (is_valid, rejection_reason)
+    """
+    # Apply layers in order
+    layers = (
+        *STRUCTURAL_LAYERS,
+        ("expiration_window", partial(
+            layer5_expiration_window,
+            max_hours=max_hours,
+            min_minutes_before=min_minutes_before,
+            max_minutes_before=max_minutes_before,
+            min_volume_for_no_max=min_volume_for_no_max,
+            now=now,
+        )),
+        ("liquidity", partial(layer6_liquidity, min_volume=min_volume)),
+    )
+    
+    def validate(event: Dict[str, Any], market: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        for layer_name, layer_func in layers:
+            rejection_reason = layer_func(event, market)
+            if rejection_reason:
+                if log_rejections:
+                    market_ticker = market.get("ticker", "unknown")
+                    print(f"  ❌ {market_ticker}: FAILED {layer_name} - {rejection_reason}")
+                return False, f"{layer_name}:{rejection_reason}"
+        return True, None
+    
+    return validate
+
+
 def is_valid_tennis_market(
     event: Dict[str, Any],
     market: Dict[str, Any],
@@ -611,10 +672,7 @@ def is_valid_tennis_market(
     """
     # Apply layers in order
     layers = [
-        ("series_category", layer1_series_category),
-        ("tennis_keywords", layer2_tennis_keywords),
-        ("match_structure", layer3_match_structure),
-        ("market_structure", layer4_market_structure),
+        *STRUCTURAL_LAYERS,
         ("expiration_window", lambda e, m: layer5_expiration_window(e, m, max_hours, min_minutes_before, max_minutes_before, min_volume_for_no_max)),
         ("liquidity", lambda e, m: layer6_liquidity(e, m, min_volume)),
     ]
@@ -656,72 +714,53 @@ def filter_tennis_markets(
     if log_rejections:
         print(f"\n🔍 Filtering {len(event_market_pairs)} event-market pairs through 6 layers...")
     
+    # Work entirely in EST
+    if ZoneInfo:
+        est_tz = ZoneInfo("America/New_York")
+    else:
+        est_tz = timezone(timedelta(hours=-5))
+    
+    # One "now" for the whole batch so every market is judged against the same instant
+    now = datetime.now(est_tz)
+    
+    # Thresholds (and "now") are fixed for the whole scan - bind them once
+    validate = make_market_validator(
+        max_hours, min_volume, min_minutes_before,
+        max_minutes_before, min_volume_for_no_max, log_rejections, now=now
+    )
+    
     for event, market in event_market_pairs:
-        is_valid, rejection_reason = is_valid_tennis_market(
-            event, market, max_hours, min_volume, 
-            min_minutes_before=min_minutes_before,
-            max_minutes_before=max_minutes_before,
-            min_volume_for_no_max=min_volume_for_no_max,
-            log_rejections=log_rejections
-        )
+        is_valid, _ = validate(event, market)
+        if not is_valid:
+            continue
         
-        if is_valid:
-            # Create normalized output record
-            market_ticker = market.get("ticker", "")
-            yes_price = market.get("yes_price") or market.get("yes_bid") or market.get("last_price")
-            no_price = market.get("no_price") or market.get("no_bid")
-            
-            # Try dollars if cents
-            if yes_price and isinstance(yes_price, (int, float)) and yes_price > 1:
-                yes_price = yes_price / 100.0
-            if no_price and isinstance(no_price, (int, float)) and no_price > 1:
-                no_price = no_price / 100.0
-            
-            # Get volume - prioritize explicit dollar fields, then generic volume
-            volume = market.get("volume_dollars") or market.get("liquidity_dollars") or market.get("volume", 0)
-            try:
-                volume = float(volume) if volume else 0
-                # If we got volume_dollars or liquidity_dollars, it's already in dollars
-                if market.get("volume_dollars") or market.get("liquidity_dollars"):
-                    # Already in dollars, use as-is
-                    pass
-                elif volume > 1000000:
-                    # Very large number - definitely in cents, convert to dollars
-                    volume = volume / 100.0
-                elif volume > 100000:
-                    # Large number - likely in cents, convert to dollars
-                    volume = volume / 100.0
-                elif volume > 10000:
-                    # Medium number - could be either, but for active markets volumes are typically $1k-$50k
-                    # If it's in the 10k-100k range, it's probably already in dollars (matches website)
-                    # Only convert if it's clearly in cents (e.g., > 50k)
-                    if volume > 50000:
-                        volume = volume / 100.0
-                    # Otherwise assume already in dollars
-                # If < 10k, assume already in dollars
-            except (ValueError, TypeError):
-                volume = 0
-            
-            valid_market = {
-                "event_title": event.get("event_title", ""),
-                "market_ticker": market_ticker,
-                "yes_price": yes_price,
-                "no_price": no_price,
-                "volume": volume,
-                "event_close_time": event.get("event_close_time") or market.get("close_time"),
-            }
-            valid_markets.append(valid_market)
+        market_ticker = market.get("ticker", "")
+        volume = _market_volume_dollars(market)
+        
+        # Create normalized output record
+        yes_price = market.get("yes_price") or market.get("yes_bid") or market.get("last_price")
+        no_price = market.get("no_price") or market.get("no_bid")
+        
+        # Try dollars if cents
+        if yes_price and isinstance(yes_price, (int, float)) and yes_price > 1:
+            yes_price = yes_price / 100.0
+        if no_price and isinstance(no_price, (int, float)) and no_price > 1:
+            no_price = no_price / 100.0
+        
+        valid_market = {
+            "event_title": event.get("event_title", ""),
+            "market_ticker": market_ticker,
+            "yes_price": yes_price,
+            "no_price": no_price,
+            "volume": volume,
+            "event_close_time": event.get("event_close_time") or market.get("close_time"),
+        }
+        valid_markets.append(valid_market)
     
     if log_rejections:
         print(f"✅ {len(valid_markets)} markets passed all filters")
     
     # Sort by: soonest event_close_time, then highest volume
-    # Work entirely in EST
-    if ZoneInfo:
-        est_tz = ZoneInfo("America/New_York")
-    else:
-        est_tz = timezone(timedelta(hours=-5))
-    
     def sort_key(m):
         close_time = m.get("event_close_time")
         volume = m.get("volume", 0)
@@ -744,7 +783,7 @@ def filter_tennis_markets(
                     dt = naive_dt.replace(tzinfo=est_tz)
             else:
                 # Default to far future in EST
-                dt = datetime.now(est_tz) + timedelta(days=365)
+                dt = now + timedelta(days=365)
             
             return (dt.timestamp(), -volume)
         except Exception:
@@ -0,0 +1,67 @@
+"""
+Unit tests for the array Elo / recent-form kernels used by build_match_dataset.
+"""
+
+import unittest
+import numpy as np
+from src.core.features.elo import Elo, SurfaceElo
+from src.core.features._elo_kernel import elo_pass, recent_win_rates
+
+
+class TestEloPass(unittest.TestCase):
+    """Kernel must agree with the Elo / SurfaceElo classes."""
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.n_players = 12
+        pairs = rng.choice(self.n_players, size=(300, 2), replace=True)
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+        self.winners = pairs[:, 0].astype(np.int64)
+        self.losers = pairs[:, 1].astype(np.int64)
+        self.surfaces = rng.integers(0, len(SurfaceElo.SURFACES), size=len(pairs)).astype(np.int64)
+
+    def test_matches_elo_classes(self):
+        p1_elo, p2_elo, p1_selo, p2_selo = elo_pass(
+            self.winners, self.losers, self.surfaces,
+            self.n_players, len(SurfaceElo.SURFACES), 1500.0, 24.0
+        )
+        elo = Elo(base=1500, k=24)
+        selo = SurfaceElo(base=1500, k=24)
+        for i, (w, l, s) in enumerate(zip(self.winners, self.losers, self.surfaces)):
+            surface = SurfaceElo.SURFACES[s]
+            self.assertEqual(p1_elo[i], elo.get(w))
+            self.assertEqual(p2_elo[i], elo.get(l))
+            self.assertEqual(p1_selo[i], selo.get(surface, w))
+            self.assertEqual(p2_selo[i], selo.get(surface, l))
+            elo.update(w, l)
+            selo.update(surface, w, l)
+
+    def test_records_pre_match_ratings(self):
+        p1_elo, p2_elo, _, _ = elo_pass(
+            np.array([0, 0]), np.array([1, 1]), np.array([0, 0]), 2, 3, 1500.0, 24.0
+        )
+        self.assertEqual((p1_elo[0], p2_elo[0]), (1500.0, 1500.0))
+        self.assertEqual((p1_elo[1], p2_elo[1]), (1512.0, 1488.0))
+
+
+class TestRecentWinRates(unittest.TestCase):
+    """Ring buffer must match a plain last-N list."""
+
+    def test_matches_last_n_mean(self):
+        rng = np.random.default_rng(3)
+        winners = rng.integers(0, 4, size=200).astype(np.int64)
+        losers = ((winners + 1 + rng.integers(0, 3, size=200)) % 4).astype(np.int64)
+        rates = recent_win_rates(winners, losers, 5, 10)
+
+        history = {}
+        for w, l in zip(winners, losers):
+            history.setdefault(w, []).append(1)
+            history.setdefault(l, []).append(0)
+        for pid in range(4):
+            self.assertEqual(rates[pid], np.mean(history[pid][-10:]))
+        # Player with no matches
+        self.assertEqual(rates[4], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
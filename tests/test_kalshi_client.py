@@ -0,0 +1,77 @@
+"""
+Unit tests for Kalshi request signing.
+"""
+
+import unittest
+from unittest import mock
+from cryptography.hazmat.primitives.asymmetric import rsa
+from src.trading import kalshi_client
+from src.trading.kalshi_client import KalshiBaseClient, KalshiHttpClient, Environment
+
+
+class TestRequestHeaders(unittest.TestCase):
+    """Test signed header reuse."""
+
+    def setUp(self):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.client = KalshiBaseClient("key-id", key, Environment.DEMO)
+
+    def test_reuses_signature_for_same_path(self):
+        first = self.client.request_headers("GET", "/trade-api/v2/markets?limit=1")
+        second = self.client.request_headers("GET", "/trade-api/v2/markets?limit=100")
+        self.assertEqual(first, second)
+
+    def test_signs_different_paths_separately(self):
+        markets = self.client.request_headers("GET", "/trade-api/v2/markets")
+        events = self.client.request_headers("GET", "/trade-api/v2/events")
+        self.assertNotEqual(markets["KALSHI-ACCESS-SIGNATURE"], events["KALSHI-ACCESS-SIGNATURE"])
+
+    def test_re_signs_after_window(self):
+        with mock.patch.object(kalshi_client, "SIGNATURE_REUSE_SECONDS", 0.0):
+            first = self.client.request_headers("GET", "/trade-api/v2/markets")
+            second = self.client.request_headers("GET", "/trade-api/v2/markets")
+        self.assertNotEqual(first["KALSHI-ACCESS-SIGNATURE"], second["KALSHI-ACCESS-SIGNATURE"])
+
+    def test_returned_headers_are_copies(self):
+        first = self.client.request_headers("GET", "/trade-api/v2/markets")
+        first["KALSHI-ACCESS-KEY"] = "mutated"
+        second = self.client.request_headers("GET", "/trade-api/v2/markets")
+        self.assertEqual(second["KALSHI-ACCESS-KEY"], "key-id")
+
+
+class TestHttpSession(unittest.TestCase):
+    """Test pooled HTTP session use."""
+
+    def setUp(self):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.client = KalshiHttpClient("key-id", key, Environment.DEMO)
+
+    def test_get_goes_through_session(self):
+        response = mock.Mock(status_code=200, content=b'{"balance": 100}')
+        with mock.patch.object(self.client.session, "get", return_value=response) as get:
+            self.assertEqual(self.client.get_balance(), {"balance": 100})
+        get.assert_called_once()
+
+    def test_only_get_is_retried(self):
+        retry = self.client.session.get_adapter(self.client.host).max_retries
+        self.assertTrue(retry.is_retry("GET", 503))
+        self.assertFalse(retry.is_retry("POST", 503))
+
+    def test_bulk_orderbooks_keyed_by_ticker(self):
+        body = b'{"orderbooks": [{"ticker": "A", "orderbook": {"yes": [[40, 5]]}}, {"ticker": "B"}]}'
+        response = mock.Mock(status_code=200, content=body)
+        with mock.patch.object(self.client.session, "get", return_value=response) as get:
+            books = self.client.get_orderbooks_bulk(["A", "B", "C"])
+        get.assert_called_once()
+        self.assertEqual(books, {"A": {"orderbook": {"yes": [[40, 5]]}}, "B": {"orderbook": {}}})
+
+    def test_bulk_orderbooks_warns_without_orderbooks_key(self):
+        response = mock.Mock(status_code=200, content=b'{"cursor": ""}')
+        with mock.patch.object(self.client.session, "get", return_value=response):
+            with self.assertLogs(kalshi_client.logger, level="WARNING"):
+                books = self.client.get_orderbooks_bulk(["A"])
+        self.assertEqual(books, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Unit tests for the fast evaluation metrics.
+"""
+
+import unittest
+import numpy as np
+from sklearn.metrics import (
+    accuracy_score, classification_report, confusion_matrix, log_loss, roc_auc_score
+)
+from sklearn.tree import DecisionTreeClassifier
+from src.evaluation.metrics import (
+    binary_confusion, confusion_report, evaluate_model, fast_auc, fast_log_loss
+)
+
+
+class TestFastMetrics(unittest.TestCase):
+    """Fast paths must agree with sklearn."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.y = rng.integers(0, 2, size=5000)
+        # Rounded so there are ties and exact 0 / 1 probabilities
+        self.proba = np.round(np.clip(self.y * 0.3 + rng.random(5000) * 0.7, 0, 1), 2)
+
+    def test_auc_matches_sklearn(self):
+        self.assertAlmostEqual(fast_auc(self.y, self.proba), roc_auc_score(self.y, self.proba))
+
+    def test_log_loss_matches_sklearn(self):
+        self.assertAlmostEqual(fast_log_loss(self.y, self.proba), log_loss(self.y, self.proba))
+
+
+class TestClassificationMetrics(unittest.TestCase):
+    """Single-pass classification metrics must agree with sklearn."""
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.X = rng.random((500, 3))
+        self.y = (self.X[:, 0] + rng.random(500) * 0.5 > 0.75).astype(int)
+        self.model = DecisionTreeClassifier(max_depth=3, random_state=0).fit(self.X, self.y)
+
+    def test_confusion_matches_sklearn(self):
+        y_pred = self.model.predict(self.X)
+        np.testing.assert_array_equal(binary_confusion(self.y, y_pred), confusion_matrix(self.y, y_pred))
+
+    def test_evaluate_model_matches_predict(self):
+        y_pred = self.model.predict(self.X)
+        out = evaluate_model(self.model, self.X, self.y)
+        self.assertAlmostEqual(out["accuracy"], accuracy_score(self.y, y_pred))
+        self.assertEqual(out["confusion_matrix"], confusion_matrix(self.y, y_pred).tolist())
+        self.assertIn("roc_auc", out)
+
+    def test_report_matches_sklearn(self):
+        y_pred = self.model.predict(self.X)
+        self.assertEqual(confusion_report(binary_confusion(self.y, y_pred)),
+                         classification_report(self.y, y_pred))
+
+
+if __name__ == "__main__":
+    unittest.main()
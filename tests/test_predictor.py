@@ -0,0 +1,92 @@
+"""
+Unit tests for MatchPredictor model loading.
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+from joblib import dump
+from sklearn.linear_model import LogisticRegression
+from src.api import predictor as predictor_module
+from src.api.predictor import MatchPredictor, FEATURES
+
+
+class TestModelCache(unittest.TestCase):
+    """Test lazy, process-wide model loading."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        X = np.vstack([np.zeros(len(FEATURES)), np.ones(len(FEATURES))])
+        model = LogisticRegression().fit(X, [0, 1])
+        dump(model, Path(self.tmp.name) / "rf_model.pkl")
+
+    def tearDown(self):
+        for key in [k for k in predictor_module._MODEL_CACHE if k.startswith(self.tmp.name)]:
+            del predictor_module._MODEL_CACHE[key]
+        self.tmp.cleanup()
+
+    def test_models_not_loaded_on_construction(self):
+        MatchPredictor(models_dir=self.tmp.name)
+        self.assertFalse(any(k.startswith(self.tmp.name) for k in predictor_module._MODEL_CACHE))
+
+    def test_instances_share_loaded_models(self):
+        first = MatchPredictor(models_dir=self.tmp.name).models["random_forest"]
+        second = MatchPredictor(models_dir=self.tmp.name).models["random_forest"]
+        self.assertIs(first, second)
+
+    def test_only_requested_models_are_loaded(self):
+        predictor = MatchPredictor(models_dir=self.tmp.name, model_names=["random_forest"])
+        self.assertEqual(list(predictor.models), ["random_forest"])
+        self.assertNotIn(str(Path(self.tmp.name) / "xgb_model.pkl"), predictor_module._MODEL_CACHE)
+
+    def test_predict_uses_lazily_loaded_model(self):
+        predictor = MatchPredictor(models_dir=self.tmp.name, model_names=["random_forest"])
+        probs = predictor.predict(np.ones((1, len(FEATURES))), enforce_symmetry=False)
+        self.assertGreater(probs["random_forest"], 0.5)
+
+
+class TestBatchPrediction(unittest.TestCase):
+    """Test batched feature building and prediction."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(40, len(FEATURES)))
+        model = LogisticRegression().fit(X, (X[:, 0] > 0).astype(int))
+        dump(model, Path(self.tmp.name) / "rf_model.pkl")
+        self.predictor = MatchPredictor(models_dir=self.tmp.name, model_names=["random_forest"])
+
+    def tearDown(self):
+        for key in [k for k in predictor_module._MODEL_CACHE if k.startswith(self.tmp.name)]:
+            del predictor_module._MODEL_CACHE[key]
+        self.tmp.cleanup()
+
+    def test_batch_matches_single_predictions(self):
+        matchups = [
+            {"player1_stats": {"elo": 1900.0, "age": 25}, "player2_stats": {"elo": 1700.0, "age": 30}},
+            {"player1_stats": {"elo": 1600.0}, "player2_stats": {"elo": 1800.0},
+             "surface": "Clay", "best_of_5": True, "h2h_diff": -0.5},
+        ]
+        X = self.predictor.build_features_batch(matchups)
+        self.assertEqual(X.shape, (2, len(FEATURES)))
+
+        batch = self.predictor.predict_batch(X)
+        for i, matchup in enumerate(matchups):
+            np.testing.assert_array_equal(X[i:i + 1], self.predictor.build_features(**matchup))
+            single = self.predictor.predict(self.predictor.build_features(**matchup))
+            self.assertAlmostEqual(batch[i]["random_forest"], single["random_forest"])
+
+    def test_proba_batch_returns_arrays(self):
+        X = self.predictor.build_features_batch([
+            {"player1_stats": {"elo": 1900.0}, "player2_stats": {"elo": 1700.0}},
+            {"player1_stats": {"elo": 1700.0}, "player2_stats": {"elo": 1900.0}},
+        ])
+        probs = self.predictor.predict_proba_batch(X)["random_forest"]
+        self.assertIsInstance(probs, np.ndarray)
+        self.assertEqual(probs.shape, (2,))
+        self.assertEqual(self.predictor.predict_batch(X)[1]["random_forest"], probs[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,26 @@
+"""
+Unit tests for the batched value / expected-value threshold kernel.
+"""
+
+import unittest
+import numpy as np
+from src.trading._value_kernel import select_tradable
+
+
+class TestSelectTradable(unittest.TestCase):
+    """Thresholds are applied to the analyzer's own trade value / EV."""
+    
+    def test_boundaries_inclusive(self):
+        mask = select_tradable(
+            np.array([0.05, 0.05, 0.04]), np.array([0.10, 0.09, 0.50]),
+            np.array([True, True, True]), 0.05, 0.10
+        )
+        self.assertEqual(mask.tolist(), [True, False, False])
+    
+    def test_untradable_rejected(self):
+        mask = select_tradable(np.array([0.30]), np.array([0.50]), np.array([False]), 0.05, 0.10)
+        self.assertFalse(mask[0])
+
+
+if __name__ == "__main__":
+    unittest.main()